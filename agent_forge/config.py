@@ -62,6 +62,8 @@ class MetricsConfig(BaseModel):
     enabled: bool = True
     collect_interval_seconds: float = 5.0
     enable_gpu: bool = True
+    gpu_poll_interval_seconds: float = 5.0
+    history_size: int = 128
     enable_per_agent: bool = True
 
 
@@ -9,6 +9,7 @@ import shutil
 from pathlib import Path
 from typing import Any
 
+from ..media_handler import StagedMedia
 from .base import ActionButton, BaseConnector, ConnectorType, InboundMessage, OutboundMessage
 
 logger = logging.getLogger(__name__)
@@ -285,14 +286,14 @@ class ConnectorManager:
             # Handle media staging if needed.
             if msg.media_paths and self.media_handler:
                 try:
-                    staged = []
+                    staged = StagedMedia()
                     last_media_type = None
                     for media_path in msg.media_paths:
-                        paths, media_type = await self.media_handler.process_and_stage(
+                        result, media_type = await self.media_handler.process_and_stage(
                             source_path=media_path,
                             agent_worktree=agent.worktree_path,
                         )
-                        staged.extend(paths)
+                        staged.extend(result)
                         last_media_type = media_type
                     if staged:
                         media_context = ""
@@ -304,7 +305,7 @@ class ConnectorManager:
                         async def _send_media_refs(
                             aid: str = agent.id,
                             ctx: str = media_context,
-                            paths: list[str] = staged,
+                            paths: list[str] = staged.paths,
                         ) -> None:
                             await asyncio.sleep(5.0)
                             if ctx:
@@ -316,7 +317,7 @@ class ConnectorManager:
                                 )
 
                         asyncio.ensure_future(_send_media_refs())
-                    file_list = "\n".join(f"  - {p}" for p in staged)
+                    file_list = "\n".join(f"  - {p}" for p in staged.paths)
                     await self._reply(
                         msg,
                         f"Spawned agent `{agent.id}` for {project_name}\n"
@@ -341,14 +342,14 @@ class ConnectorManager:
         if msg.media_paths and self.media_handler:
             temp_paths = list(msg.media_paths)
             try:
-                staged: list[str] = []
+                staged = StagedMedia()
                 last_media_type = None
                 for media_path in msg.media_paths:
-                    paths, media_type = await self.media_handler.process_and_stage(
+                    result, media_type = await self.media_handler.process_and_stage(
                         source_path=media_path,
                         agent_worktree=agent.worktree_path,
                     )
-                    staged.extend(paths)
+                    staged.extend(result)
                     last_media_type = media_type
 
                 media_context = ""
@@ -358,9 +359,9 @@ class ConnectorManager:
                     )
 
                 await self.agent_manager.send_message_with_media(
-                    agent.id, msg.text, staged, media_context=media_context
+                    agent.id, msg.text, staged.paths, media_context=media_context
                 )
-                file_list = "\n".join(f"  - {p}" for p in staged)
+                file_list = "\n".join(f"  - {p}" for p in staged.paths)
                 await self._reply(msg, f"Staged to `{agent.id}` ({project_name}):\n{file_list}")
                 self._set_context(msg.connector_id, msg.channel_id, agent.id)
                 self._track_reply_channel(msg.connector_id, msg.channel_id, project_name)
@@ -50,6 +50,10 @@ async def init_db(path: str = "agent_forge.db") -> aiosqlite.Connection:
     """Create tables and return an open database connection."""
     db = await aiosqlite.connect(path)
     db.row_factory = aiosqlite.Row
+    # WAL with synchronous=NORMAL syncs at checkpoints rather than on every
+    # commit; the poll loop commits every few seconds
+    await db.execute("PRAGMA journal_mode=WAL")
+    await db.execute("PRAGMA synchronous=NORMAL")
     await db.executescript(SCHEMA)
     await db.commit()
     # Migrate existing tables: add new columns if missing
@@ -133,35 +137,44 @@ async def get_events(
     return results
 
 
-async def save_snapshot(db: aiosqlite.Connection, agent: Agent) -> None:
-    """Upsert the current state of an agent into agent_snapshots."""
-    await db.execute(
-        """INSERT OR REPLACE INTO agent_snapshots
-           (agent_id, project_name, session_name, worktree_path, branch_name,
-            status, task_description, created_at, last_activity, last_output,
-            needs_attention, parked, last_response, last_user_message, profile)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            agent.id,
-            agent.project_name,
-            agent.session_name,
-            agent.worktree_path,
-            agent.branch_name,
-            agent.status.value,
-            agent.task_description,
-            agent.created_at.isoformat(),
-            agent.last_activity.isoformat(),
-            agent.last_output[-5000:] if agent.last_output else "",
-            int(agent.needs_attention),
-            int(agent.parked),
-            agent.last_response[-5000:] if agent.last_response else "",
-            agent.last_user_message[-2000:] if agent.last_user_message else "",
-            agent.profile,
-        ),
+_SNAPSHOT_UPSERT = """INSERT OR REPLACE INTO agent_snapshots
+   (agent_id, project_name, session_name, worktree_path, branch_name,
+    status, task_description, created_at, last_activity, last_output,
+    needs_attention, parked, last_response, last_user_message, profile)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _snapshot_row(agent: Agent) -> tuple:
+    return (
+        agent.id,
+        agent.project_name,
+        agent.session_name,
+        agent.worktree_path,
+        agent.branch_name,
+        agent.status.value,
+        agent.task_description,
+        agent.created_at.isoformat(),
+        agent.last_activity.isoformat(),
+        agent.last_output[-5000:] if agent.last_output else "",
+        int(agent.needs_attention),
+        int(agent.parked),
+        agent.last_response[-5000:] if agent.last_response else "",
+        agent.last_user_message[-2000:] if agent.last_user_message else "",
+        agent.profile,
     )
+
+
+async def save_snapshots(db: aiosqlite.Connection, agents: list[Agent]) -> None:
+    """Upsert several agents in a single transaction."""
+    await db.executemany(_SNAPSHOT_UPSERT, [_snapshot_row(agent) for agent in agents])
     await db.commit()
 
 
+async def save_snapshot(db: aiosqlite.Connection, agent: Agent) -> None:
+    """Upsert the current state of an agent into agent_snapshots."""
+    await save_snapshots(db, [agent])
+
+
 async def load_snapshots(db: aiosqlite.Connection) -> list[dict]:
     """Load all saved agent snapshots."""
     cursor = await db.execute("SELECT * FROM agent_snapshots")
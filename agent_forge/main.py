@@ -15,7 +15,7 @@ import subprocess
 import uvicorn
 import yaml
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -35,6 +35,8 @@ from .config import (
 from .database import delete_snapshot, get_events, init_db, log_event
 from .log_manager import LogManager
 from .registry import ProjectRegistry
+from .response_extractor import close_client as close_extractor_client
+from .summarizer import close_client as close_summarizer_client
 from .terminal_bridge import TerminalBridgeManager
 from .websocket_manager import WebSocketManager
 
@@ -160,6 +162,8 @@ async def lifespan(app: FastAPI):
         await status_monitor.stop()
     if connector_manager:
         await connector_manager.stop()
+    await close_extractor_client()
+    await close_summarizer_client()
     await db.close()
     logger.info("Agent Forge shut down (agents left running)")
 
@@ -633,7 +637,17 @@ async def api_metrics(request: Request):
     if not monitor or not monitor.metrics_collector:
         raise HTTPException(status_code=503, detail="Metrics collection not available")
     snapshot = monitor.metrics_collector.collect_all(request.app.state.agent_manager)
-    return snapshot.model_dump(mode="json")
+    return Response(content=snapshot.to_json(), media_type="application/json")
+
+
+@app.get("/api/metrics/history")
+async def api_metrics_history(request: Request, limit: int | None = None):
+    """Return recently collected metrics snapshots, oldest first."""
+    monitor = request.app.state.status_monitor
+    if not monitor or not monitor.metrics_collector:
+        raise HTTPException(status_code=503, detail="Metrics collection not available")
+    content = monitor.metrics_collector.history_json(limit)
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/api/claude-usage")
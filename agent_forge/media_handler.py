@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
 import shutil
+import threading
 import time
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
@@ -23,36 +27,108 @@ AUDIO_EXTENSIONS = {".ogg", ".mp3", ".wav", ".m4a", ".flac", ".opus"}
 DOCUMENT_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt", ".csv", ".xlsx", ".md", ".json"}
 
 
+@dataclass
+class StagedMedia:
+    """Worktree-relative paths staged for one or more media files, by role."""
+    originals: list[str] = field(default_factory=list)
+    frames: list[str] = field(default_factory=list)
+    transcripts: list[str] = field(default_factory=list)
+
+    @property
+    def paths(self) -> list[str]:
+        """All staged paths, originals first."""
+        return [*self.originals, *self.frames, *self.transcripts]
+
+    def extend(self, other: StagedMedia) -> None:
+        """Merge another staging result into this one."""
+        self.originals.extend(other.originals)
+        self.frames.extend(other.frames)
+        self.transcripts.extend(other.transcripts)
+
+    def __bool__(self) -> bool:
+        return bool(self.originals or self.frames or self.transcripts)
+
+
+# Speech is split on VAD-detected silences into chunks of at most
+# WHISPER_CHUNK_SECONDS, which are transcribed together in batches of
+# WHISPER_BATCH_SIZE instead of sliding a window over the whole file.
+WHISPER_CHUNK_SECONDS = 30
+WHISPER_BATCH_SIZE = 16
+
+# faster-whisper model shared by all handlers, loaded on first transcription.
+# _whisper_unavailable records that faster-whisper is not installed, so the
+# import is not retried; a failed model load is retried on the next call.
+_whisper_model: Any = None
+_whisper_unavailable = False
+_whisper_lock = threading.Lock()
+
+
+def _get_whisper_model() -> Any:
+    """Return the shared faster-whisper batched pipeline, or None if unavailable."""
+    global _whisper_model, _whisper_unavailable
+    with _whisper_lock:
+        if _whisper_model is None and not _whisper_unavailable:
+            try:
+                from faster_whisper import BatchedInferencePipeline, WhisperModel
+                _whisper_model = BatchedInferencePipeline(
+                    WhisperModel("base", compute_type="int8")
+                )
+                logger.info("Loaded faster-whisper model for transcription")
+            except ImportError:
+                logger.debug("faster-whisper not available; using whisper CLI")
+                _whisper_unavailable = True
+            except Exception:
+                # Often transient (model download, disk space); try again next time
+                logger.warning("Failed to load faster-whisper model", exc_info=True)
+        return _whisper_model
+
+
+def _transcribe_with_model(model: Any, audio_path: str) -> str | None:
+    """Run a blocking faster-whisper transcription (call from a worker thread)."""
+    segments, _info = model.transcribe(
+        audio_path,
+        vad_filter=True,
+        chunk_length=WHISPER_CHUNK_SECONDS,
+        batch_size=WHISPER_BATCH_SIZE,
+    )
+    # segments is a lazy generator; decoding happens while iterating
+    text = " ".join(segment.text.strip() for segment in segments).strip()
+    return text or None
+
+
 class MediaHandler:
     """Downloads and processes media files, stages them in agent worktrees."""
 
     def __init__(self, temp_dir: str = "/tmp/agent-forge-media"):
         self.temp_dir = Path(temp_dir)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        # Per-instance sequence so files staged within the same clock tick
+        # still get distinct names instead of overwriting each other
+        self._seq = itertools.count()
 
     async def process_and_stage(
         self,
         source_path: str,
         agent_worktree: str,
         media_type: MediaType | None = None,
-    ) -> tuple[list[str], MediaType]:
+    ) -> tuple[StagedMedia, MediaType]:
         """Process media and stage in worktree.
 
-        Returns (staged_paths, detected_media_type) so callers can use
+        Returns (staged, detected_media_type) so callers can use
         build_media_reference().
         """
         if media_type is None:
             media_type = self._detect_type(source_path)
         media_dir = self._ensure_media_dir(agent_worktree)
-        timestamp = int(time.time())
+        timestamp = f"{time.time_ns():x}_{next(self._seq)}"
         source = Path(source_path)
-        staged_paths: list[str] = []
+        staged = StagedMedia()
 
         # Always stage the original file first
         dest_name = f"{timestamp}_{source.name}"
         dest = media_dir / dest_name
         shutil.copy2(source_path, dest)
-        staged_paths.append(f".media/{dest_name}")
+        staged.originals.append(f".media/{dest_name}")
 
         # Type-specific processing (enrichment on top of the original)
         if media_type == MediaType.IMAGE:
@@ -75,22 +151,23 @@ class MediaHandler:
                     fname = f"{timestamp}_{frame_file.name}"
                     fdest = media_dir / fname
                     shutil.copy2(frame_path, fdest)
-                    staged_paths.append(f".media/{fname}")
+                    staged.frames.append(f".media/{fname}")
             except Exception:
                 logger.debug("Video frame extraction failed for %s", source.name)
 
         elif media_type == MediaType.AUDIO:
             try:
-                transcript = await self._transcribe_audio(source_path, str(self.temp_dir))
-                if transcript:
+                transcript_path = await self._transcribe_audio(source_path, str(self.temp_dir))
+                if transcript_path:
                     txt_name = f"{timestamp}_transcript.txt"
                     txt_dest = media_dir / txt_name
-                    txt_dest.write_text(transcript)
-                    staged_paths.append(f".media/{txt_name}")
+                    # A rename when temp dir and worktree share a filesystem
+                    shutil.move(transcript_path, txt_dest)
+                    staged.transcripts.append(f".media/{txt_name}")
             except Exception:
                 logger.debug("Audio transcription failed for %s", source.name)
 
-        return staged_paths, media_type
+        return staged, media_type
 
     def _ensure_media_dir(self, worktree: str) -> Path:
         media_dir = Path(worktree) / ".media"
@@ -124,17 +201,19 @@ class MediaHandler:
                 f"{output_dir}/frame_%03d.png",
             ]
         else:
-            # Extract keyframes
+            # Extract keyframes: the decoder skips non-keyframes entirely, and
+            # uses hardware decoding when available (falls back to CPU)
             cmd = [
-                "ffmpeg", "-i", video_path,
-                "-vf", "select='eq(ptype,I)'",
-                "-vsync", "vfr",
+                "ffmpeg", "-hwaccel", "auto",
+                "-skip_frame", "nokey",
+                "-i", video_path,
+                "-vsync", "0",
                 "-frames:v", "10",
                 f"{output_dir}/frame_%03d.png",
             ]
 
         proc = await asyncio.create_subprocess_exec(
-            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
         )
         try:
             await asyncio.wait_for(proc.communicate(), timeout=60)
@@ -155,7 +234,7 @@ class MediaHandler:
             video_path,
         ]
         proc = await asyncio.create_subprocess_exec(
-            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
         )
         stdout, _ = await proc.communicate()
         try:
@@ -165,8 +244,35 @@ class MediaHandler:
 
     async def _transcribe_audio(
         self, audio_path: str, output_dir: str
-    ) -> str | None:
-        """Transcribe using whisper if available."""
+    ) -> Path | None:
+        """Transcribe in-process with faster-whisper, else via the whisper CLI.
+
+        Returns the path of a non-empty transcript file in *output_dir* (as
+        the CLI writes it) so callers can move it rather than copy its text.
+        """
+        txt_path = Path(output_dir) / f"{Path(audio_path).stem}.txt"
+
+        # Loading the model the first time is slow, so keep it off the event loop
+        model = await asyncio.to_thread(_get_whisper_model)
+        if model is not None:
+            try:
+                transcript = await asyncio.wait_for(
+                    asyncio.to_thread(_transcribe_with_model, model, audio_path),
+                    timeout=300,
+                )
+                if not transcript:
+                    return None
+                txt_path.write_text(transcript)
+                return txt_path
+            except asyncio.TimeoutError:
+                logger.error("faster-whisper timed out transcribing %s", audio_path)
+                return None
+            except Exception:
+                logger.warning(
+                    "faster-whisper failed on %s, trying whisper CLI", audio_path,
+                    exc_info=True,
+                )
+
         # Check if whisper is installed
         if not shutil.which("whisper"):
             logger.info("whisper not installed, skipping transcription")
@@ -179,7 +285,7 @@ class MediaHandler:
             "--output_dir", output_dir,
         ]
         proc = await asyncio.create_subprocess_exec(
-            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
         )
         try:
             await asyncio.wait_for(proc.communicate(), timeout=300)
@@ -188,11 +294,12 @@ class MediaHandler:
             logger.error("whisper timed out transcribing %s", audio_path)
             return None
 
-        # Read the output txt file
-        audio_name = Path(audio_path).stem
-        txt_path = Path(output_dir) / f"{audio_name}.txt"
-        if txt_path.exists():
-            return txt_path.read_text().strip()
+        # Hand back the output txt file if whisper produced any text
+        try:
+            if txt_path.read_text().strip():
+                return txt_path
+        except OSError:
+            pass
         return None
 
     async def _resize_image(
@@ -208,7 +315,7 @@ class MediaHandler:
             image_path,
         ]
         proc = await asyncio.create_subprocess_exec(
-            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
         )
         stdout, _ = await proc.communicate()
 
@@ -230,44 +337,39 @@ class MediaHandler:
             "-y", output_path,
         ]
         proc = await asyncio.create_subprocess_exec(
-            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
         )
         await asyncio.wait_for(proc.communicate(), timeout=60)
 
         return output_path if Path(output_path).exists() else image_path
 
     def build_media_reference(
-        self, staged_paths: list[str], media_type: MediaType
+        self, staged: StagedMedia, media_type: MediaType
     ) -> str:
         """Build text referencing staged media files."""
-        if not staged_paths:
+        if not staged:
             return ""
 
-        paths_str = ", ".join(staged_paths)
+        paths_str = ", ".join(staged.paths)
 
         if media_type == MediaType.IMAGE:
             return f"Image file at: {paths_str}."
         elif media_type == MediaType.VIDEO:
-            video_files = [p for p in staged_paths if Path(p).suffix.lower() in VIDEO_EXTENSIONS]
-            frame_files = [p for p in staged_paths if p not in video_files]
             parts = []
-            if video_files:
-                parts.append(f"Video file at: {', '.join(video_files)}")
-            if frame_files:
-                parts.append(f"Extracted keyframes at: {', '.join(frame_files)}")
+            if staged.originals:
+                parts.append(f"Video file at: {', '.join(staged.originals)}")
+            if staged.frames:
+                parts.append(f"Extracted keyframes at: {', '.join(staged.frames)}")
             return ". ".join(parts) + "."
         elif media_type == MediaType.AUDIO:
-            # Check if there's a transcript
-            transcripts = [p for p in staged_paths if "transcript" in p]
-            audio_files = [p for p in staged_paths if "transcript" not in p]
             parts = []
-            if transcripts:
+            if staged.transcripts:
                 parts.append(
-                    f"Voice message transcript is at: {', '.join(transcripts)}"
+                    f"Voice message transcript is at: {', '.join(staged.transcripts)}"
                 )
-            if audio_files:
+            if staged.originals:
                 parts.append(
-                    f"Original audio file at: {', '.join(audio_files)}"
+                    f"Original audio file at: {', '.join(staged.originals)}"
                 )
             return ". ".join(parts)
         elif media_type == MediaType.DOCUMENT:
@@ -5,11 +5,21 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
+import sys
 import time
-from typing import TYPE_CHECKING
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
 import psutil
-from pydantic import BaseModel
+from pydantic import TypeAdapter
+
+try:
+    import pynvml  # optional: pip install agent-forge[gpu]
+except ImportError:
+    pynvml = None
+
+from .agent_manager import AgentStatus
 
 if TYPE_CHECKING:
     from .agent_manager import Agent, AgentManager
@@ -17,9 +27,19 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 TMUX_TIMEOUT = 5
-
-
-class SystemMetrics(BaseModel):
+PROC_ROOT = "/proc"
+# The raw /proc/<pid>/stat reader assumes the Linux procfs layout; other
+# platforms (including BSDs with their own procfs) go through psutil.
+LINUX_PROCFS = sys.platform.startswith("linux")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+# Disk usage and load average change over seconds, so callers polling
+# faster than this reuse the previous reading instead of re-querying.
+SLOW_METRICS_TTL = 1.0
+
+
+@dataclass(slots=True)
+class SystemMetrics:
     """System-wide resource metrics."""
     cpu_percent: float
     memory_percent: float
@@ -40,7 +60,8 @@ class SystemMetrics(BaseModel):
     gpu_temperature: float | None = None
 
 
-class AgentMetrics(BaseModel):
+@dataclass(slots=True)
+class AgentMetrics:
     """Per-agent resource metrics."""
     agent_id: str
     process_count: int
@@ -48,7 +69,8 @@ class AgentMetrics(BaseModel):
     memory_mb: float
 
 
-class MetricsSnapshot(BaseModel):
+@dataclass(slots=True)
+class MetricsSnapshot:
     """Complete snapshot of system and agent metrics."""
     timestamp: float
     system: SystemMetrics
@@ -56,17 +78,60 @@ class MetricsSnapshot(BaseModel):
     total_agents_running: int
     total_agent_memory_mb: float
 
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-compatible dict of the snapshot."""
+        return _SNAPSHOT_ADAPTER.dump_python(self, mode="json")
+
+    def to_json(self) -> bytes:
+        """Serialize the snapshot straight to JSON bytes."""
+        return _SNAPSHOT_ADAPTER.dump_json(self)
+
+
+@dataclass(slots=True)
+class _ProcessTable:
+    """One pass over the process table shared by every agent in a collection."""
+    samples: dict[int, tuple[float, int]]  # pid -> (cpu_percent, rss_bytes)
+    children: dict[int, list[int]]  # ppid -> child pids
+
+
+# Built once: the metrics structs are plain dataclasses, so pydantic only
+# gets involved when a snapshot is serialized for the API or WebSocket.
+_SNAPSHOT_ADAPTER = TypeAdapter(MetricsSnapshot)
+_HISTORY_ADAPTER = TypeAdapter(list[MetricsSnapshot])
+
 
 class MetricsCollector:
     """Collects system and per-agent metrics using psutil and pynvml (optional)."""
 
-    def __init__(self, enable_gpu: bool = True) -> None:
+    def __init__(
+        self,
+        enable_gpu: bool = True,
+        gpu_poll_interval: float = 5.0,
+        history_size: int = 128,
+    ) -> None:
         self.gpu_available = False
         self.gpu_handle = None
-        self._last_net_io: tuple[float, float, float] | None = None  # (timestamp, bytes_sent, bytes_recv)
-        # Cache psutil.Process objects keyed by PID so cpu_percent(interval=0)
-        # has a prior measurement and returns meaningful values on the second call.
-        self._proc_cache: dict[int, psutil.Process] = {}
+        # Per-device constants, resolved once in _init_gpu
+        self._gpu_name: str | None = None
+        self._gpu_memory_total_mb: float | None = None
+        # NVML readings refresh slowly, so the last (utilization, used MB,
+        # temperature) sample is reused until gpu_poll_interval has passed
+        self._gpu_poll_interval = gpu_poll_interval
+        self._gpu_sample: tuple[float, float, float] | None = None
+        self._gpu_sample_time = 0.0
+        self._last_net_io: tuple[float, float, float] | None = None  # (monotonic timestamp, bytes_sent, bytes_recv)
+        # (monotonic timestamp, value) of the last disk_usage / getloadavg reading
+        self._disk_cache: tuple[float, Any] | None = None
+        self._loadavg_cache: tuple[float, tuple[float, float, float]] | None = None
+        # (start time, cumulative CPU ticks) per PID from the previous process
+        # snapshot, so the next snapshot can turn them into a CPU percentage.
+        # Only live PIDs are kept; the start time guards against PID reuse.
+        self._last_ticks: dict[int, tuple[int, int]] = {}
+        self._last_ticks_time = 0.0
+        # Most recent snapshots, oldest first. Bounded, and appended from the
+        # collection path only, so readers can take list(self.history)
+        # without a lock.
+        self.history: deque[MetricsSnapshot] = deque(maxlen=history_size)
 
         if enable_gpu:
             self._init_gpu()
@@ -74,20 +139,27 @@ class MetricsCollector:
         # Initialize network baseline
         try:
             net = psutil.net_io_counters()
-            self._last_net_io = (time.time(), net.bytes_sent, net.bytes_recv)
+            self._last_net_io = (time.monotonic(), net.bytes_sent, net.bytes_recv)
         except Exception:
             logger.debug("Failed to initialize network baseline", exc_info=True)
 
     def _init_gpu(self) -> None:
         """Try to initialize pynvml for GPU monitoring."""
+        if pynvml is None:
+            logger.debug("pynvml not available; GPU metrics disabled")
+            return
         try:
-            import pynvml
             pynvml.nvmlInit()
             self.gpu_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            # Device name and total memory never change during a run
+            gpu_name = pynvml.nvmlDeviceGetName(self.gpu_handle)
+            if isinstance(gpu_name, bytes):
+                gpu_name = gpu_name.decode('utf-8')
+            self._gpu_name = gpu_name
+            total = pynvml.nvmlDeviceGetMemoryInfo(self.gpu_handle).total
+            self._gpu_memory_total_mb = total / (1024 * 1024)
             self.gpu_available = True
             logger.info("GPU monitoring enabled via pynvml")
-        except ImportError:
-            logger.debug("pynvml not available; GPU metrics disabled")
         except Exception:
             logger.debug("Failed to initialize pynvml", exc_info=True)
 
@@ -102,33 +174,42 @@ class MetricsCollector:
         memory_used_mb = mem.used / (1024 * 1024)
         memory_total_mb = mem.total / (1024 * 1024)
 
+        now_mono = time.monotonic()
+
         # Disk
-        disk = psutil.disk_usage('/')
+        if self._disk_cache and now_mono - self._disk_cache[0] < SLOW_METRICS_TTL:
+            disk = self._disk_cache[1]
+        else:
+            disk = psutil.disk_usage('/')
+            self._disk_cache = (now_mono, disk)
         disk_percent = disk.percent
         disk_used_gb = disk.used / (1024 * 1024 * 1024)
         disk_total_gb = disk.total / (1024 * 1024 * 1024)
 
         # Load average (Unix-like systems)
-        try:
-            load_1, load_5, load_15 = os.getloadavg()
-        except (AttributeError, OSError):
-            load_1 = load_5 = load_15 = 0.0
+        if self._loadavg_cache and now_mono - self._loadavg_cache[0] < SLOW_METRICS_TTL:
+            load_1, load_5, load_15 = self._loadavg_cache[1]
+        else:
+            try:
+                load_1, load_5, load_15 = os.getloadavg()
+            except (AttributeError, OSError):
+                load_1 = load_5 = load_15 = 0.0
+            self._loadavg_cache = (now_mono, (load_1, load_5, load_15))
 
         # Network throughput (compute delta from last call)
         network_sent_mbps = 0.0
         network_recv_mbps = 0.0
         try:
             net = psutil.net_io_counters()
-            now = time.time()
             if self._last_net_io:
                 last_time, last_sent, last_recv = self._last_net_io
-                delta_time = now - last_time
-                if delta_time > 0:
-                    delta_sent = net.bytes_sent - last_sent
-                    delta_recv = net.bytes_recv - last_recv
+                delta_time = now_mono - last_time
+                delta_sent = net.bytes_sent - last_sent
+                delta_recv = net.bytes_recv - last_recv
+                if delta_time > 0 and (delta_sent or delta_recv):
                     network_sent_mbps = (delta_sent / delta_time) / (1024 * 1024)
                     network_recv_mbps = (delta_recv / delta_time) / (1024 * 1024)
-            self._last_net_io = (now, net.bytes_sent, net.bytes_recv)
+            self._last_net_io = (now_mono, net.bytes_sent, net.bytes_recv)
         except Exception:
             logger.debug("Failed to collect network metrics", exc_info=True)
 
@@ -140,19 +221,28 @@ class MetricsCollector:
         gpu_temperature = None
 
         if self.gpu_available and self.gpu_handle:
-            try:
-                import pynvml
-                gpu_name = pynvml.nvmlDeviceGetName(self.gpu_handle)
-                if isinstance(gpu_name, bytes):
-                    gpu_name = gpu_name.decode('utf-8')
-                util = pynvml.nvmlDeviceGetUtilizationRates(self.gpu_handle)
-                gpu_utilization = float(util.gpu)
-                mem_info = pynvml.nvmlDeviceGetMemoryInfo(self.gpu_handle)
-                gpu_memory_used_mb = mem_info.used / (1024 * 1024)
-                gpu_memory_total_mb = mem_info.total / (1024 * 1024)
-                gpu_temperature = float(pynvml.nvmlDeviceGetTemperature(self.gpu_handle, pynvml.NVML_TEMPERATURE_GPU))
-            except Exception:
-                logger.debug("Failed to collect GPU metrics", exc_info=True)
+            gpu_name = self._gpu_name
+            gpu_memory_total_mb = self._gpu_memory_total_mb
+            if (
+                self._gpu_sample is None
+                or now_mono - self._gpu_sample_time >= self._gpu_poll_interval
+            ):
+                try:
+                    util = pynvml.nvmlDeviceGetUtilizationRates(self.gpu_handle)
+                    mem_info = pynvml.nvmlDeviceGetMemoryInfo(self.gpu_handle)
+                    temperature = pynvml.nvmlDeviceGetTemperature(
+                        self.gpu_handle, pynvml.NVML_TEMPERATURE_GPU,
+                    )
+                    self._gpu_sample = (
+                        float(util.gpu),
+                        mem_info.used / (1024 * 1024),
+                        float(temperature),
+                    )
+                    self._gpu_sample_time = now_mono
+                except Exception:
+                    logger.debug("Failed to collect GPU metrics", exc_info=True)
+            if self._gpu_sample is not None:
+                gpu_utilization, gpu_memory_used_mb, gpu_temperature = self._gpu_sample
 
         return SystemMetrics(
             cpu_percent=cpu_percent,
@@ -190,31 +280,114 @@ class MetricsCollector:
         except (subprocess.TimeoutExpired, FileNotFoundError, ValueError, IndexError):
             return None
 
-    def _get_or_cache_proc(self, pid: int) -> psutil.Process | None:
-        """Get a cached Process object, or create and warm up a new one."""
-        proc = self._proc_cache.get(pid)
-        if proc is not None:
-            try:
-                proc.status()  # verify still alive
-                return proc
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                del self._proc_cache[pid]
+    @staticmethod
+    def _get_all_pane_pids() -> dict[str, int]:
+        """Map every tmux session to its first pane's root PID with a single tmux call."""
         try:
-            proc = psutil.Process(pid)
-            # Warm-up call so the next cpu_percent(interval=0) returns real data
-            proc.cpu_percent(interval=0)
-            self._proc_cache[pid] = proc
-            return proc
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return None
+            result = subprocess.run(
+                ["tmux", "list-panes", "-a", "-F", "#{session_name} #{pane_pid}"],
+                capture_output=True, text=True, timeout=TMUX_TIMEOUT,
+            )
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return {}
+        if result.returncode != 0:
+            return {}
+        pane_pids: dict[str, int] = {}
+        for line in result.stdout.splitlines():
+            session_name, _, pid_str = line.rpartition(" ")
+            if session_name and pid_str.isdigit():
+                # Keep the first pane listed for each session
+                pane_pids.setdefault(session_name, int(pid_str))
+        return pane_pids
+
+    def _snapshot_processes(self) -> _ProcessTable:
+        """Sample every process once: CPU, RSS and a parent -> children index.
+
+        On Linux a single read of /proc/<pid>/stat yields the parent PID,
+        cumulative CPU ticks and resident pages; CPU percent is the tick
+        delta since the previous snapshot. Elsewhere one psutil.process_iter
+        pass with an attrs filter provides the same data.
+        """
+        if not LINUX_PROCFS:
+            return self._snapshot_processes_psutil()
+        try:
+            entries = os.listdir(PROC_ROOT)
+        except OSError:
+            return self._snapshot_processes_psutil()
+
+        now = time.monotonic()
+        elapsed = now - self._last_ticks_time if self._last_ticks_time else 0.0
+        last_ticks = self._last_ticks
+        ticks: dict[int, tuple[int, int]] = {}
+        samples: dict[int, tuple[float, int]] = {}
+        children: dict[int, list[int]] = {}
+        for name in entries:
+            if not name.isdigit():
+                continue
+            try:
+                with open(f"{PROC_ROOT}/{name}/stat", "rb") as f:
+                    stat = f.read()
+                # comm (field 2) may contain spaces, so parse after the last ')':
+                # fields[0] is state (field 3), so field N is fields[N - 3]
+                fields = stat[stat.rindex(b")") + 2:].split()
+                ppid = int(fields[1])
+                cpu_ticks = int(fields[11]) + int(fields[12])  # utime + stime
+                start_time = int(fields[19])
+                rss = int(fields[21]) * PAGE_SIZE
+            except (OSError, ValueError, IndexError):
+                continue  # process exited mid-scan or unreadable
+            pid = int(name)
+            ticks[pid] = (start_time, cpu_ticks)
+            cpu_percent = 0.0
+            prev = last_ticks.get(pid)
+            # A different start time means the PID now belongs to a new process
+            if prev is not None and prev[0] == start_time and elapsed > 0:
+                cpu_percent = (cpu_ticks - prev[1]) / CLK_TCK / elapsed * 100
+            samples[pid] = (cpu_percent, rss)
+            children.setdefault(ppid, []).append(pid)
+
+        self._last_ticks = ticks
+        self._last_ticks_time = now
+        return _ProcessTable(samples=samples, children=children)
 
-    def collect_agent(self, agent: Agent) -> AgentMetrics | None:
+    @staticmethod
+    def _snapshot_processes_psutil() -> _ProcessTable:
+        """Portable fallback for _snapshot_processes using one psutil pass.
+
+        process_iter keeps its Process objects between calls, so
+        cpu_percent is the delta since the previous snapshot.
+        """
+        samples: dict[int, tuple[float, int]] = {}
+        children: dict[int, list[int]] = {}
+        for proc in psutil.process_iter(["ppid", "cpu_percent", "memory_info"]):
+            info = proc.info
+            mem_info = info.get("memory_info")
+            samples[proc.pid] = (
+                info.get("cpu_percent") or 0.0,
+                mem_info.rss if mem_info is not None else 0,
+            )
+            ppid = info.get("ppid")
+            if ppid is not None:
+                children.setdefault(ppid, []).append(proc.pid)
+        return _ProcessTable(samples=samples, children=children)
+
+    def collect_agent(
+        self,
+        agent: Agent,
+        pane_pids: dict[str, int] | None = None,
+        processes: _ProcessTable | None = None,
+    ) -> AgentMetrics | None:
         """Collect resource metrics for a single agent.
 
-        Uses tmux list-panes to get the pane's root PID, then walks
-        the process tree via psutil to aggregate CPU/memory usage.
+        Resolves the pane's root PID from *pane_pids* (as returned by
+        _get_all_pane_pids) or, when not given, via tmux list-panes, then
+        aggregates CPU/memory over the pane's process tree in *processes*
+        (a fresh process snapshot is taken when not given).
         """
-        pane_pid = self._get_pane_pid(agent.session_name)
+        if pane_pids is not None:
+            pane_pid = pane_pids.get(agent.session_name)
+        else:
+            pane_pid = self._get_pane_pid(agent.session_name)
         if pane_pid is None:
             return AgentMetrics(
                 agent_id=agent.id,
@@ -222,63 +395,79 @@ class MetricsCollector:
                 cpu_percent=0.0,
                 memory_mb=0.0,
             )
+        if processes is None:
+            processes = self._snapshot_processes()
 
-        # Collect the pane root process and all its descendants
-        all_pids: set[int] = {pane_pid}
-        try:
-            root = psutil.Process(pane_pid)
-            for child in root.children(recursive=True):
-                all_pids.add(child.pid)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-
-        # Aggregate metrics using cached Process objects
+        # Walk the pane root process and all its descendants
+        samples = processes.samples
+        children = processes.children
         total_cpu = 0.0
-        total_memory = 0.0
+        total_rss = 0
         process_count = 0
-
-        for pid in all_pids:
-            proc = self._get_or_cache_proc(pid)
-            if proc is None:
+        seen: set[int] = set()
+        stack = [pane_pid]
+        while stack:
+            pid = stack.pop()
+            if pid in seen:
                 continue
-            try:
-                total_cpu += proc.cpu_percent(interval=0)
-                mem_info = proc.memory_info()
-                total_memory += mem_info.rss / (1024 * 1024)  # MB
+            seen.add(pid)
+            sample = samples.get(pid)
+            if sample is not None:
+                total_cpu += sample[0]
+                total_rss += sample[1]
                 process_count += 1
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                self._proc_cache.pop(pid, None)
+            stack.extend(children.get(pid, ()))
 
         return AgentMetrics(
             agent_id=agent.id,
             process_count=process_count,
             cpu_percent=total_cpu,
-            memory_mb=total_memory,
+            memory_mb=total_rss / (1024 * 1024),
         )
 
     def collect_all(self, agent_manager: AgentManager) -> MetricsSnapshot:
-        """Collect system metrics and per-agent metrics for all non-stopped agents."""
+        """Collect system metrics and per-agent metrics for all non-stopped agents.
+
+        The tmux pane lookup and process-table scan happen once per call;
+        each agent then only walks its own subtree of that in-memory table.
+        """
         system = self.collect_system()
         agents: dict[str, AgentMetrics] = {}
         total_memory = 0.0
         running_count = 0
 
-        from .agent_manager import AgentStatus
+        running = [
+            agent for agent in agent_manager.list_agents()
+            if agent.status != AgentStatus.STOPPED
+        ]
+        # One tmux call and one process-table snapshot shared by every agent
+        pane_pids: dict[str, int] = {}
+        processes = _ProcessTable(samples={}, children={})
+        if running:
+            pane_pids = self._get_all_pane_pids()
+            processes = self._snapshot_processes()
 
-        for agent in agent_manager.list_agents():
-            if agent.status == AgentStatus.STOPPED:
-                continue
+        results = [self.collect_agent(agent, pane_pids, processes) for agent in running]
 
-            agent_metrics = self.collect_agent(agent)
+        for agent, agent_metrics in zip(running, results):
             if agent_metrics:
                 agents[agent.id] = agent_metrics
                 total_memory += agent_metrics.memory_mb
                 running_count += 1
 
-        return MetricsSnapshot(
+        snapshot = MetricsSnapshot(
             timestamp=time.time(),
             system=system,
             agents=agents,
             total_agents_running=running_count,
             total_agent_memory_mb=total_memory,
         )
+        self.history.append(snapshot)
+        return snapshot
+
+    def history_json(self, limit: int | None = None) -> bytes:
+        """Serialize the recorded snapshots (newest last) to JSON bytes."""
+        snapshots = list(self.history)
+        if limit is not None:
+            snapshots = snapshots[-limit:] if limit > 0 else []
+        return _HISTORY_ADAPTER.dump_json(snapshots)
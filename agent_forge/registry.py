@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import logging
+import os
 from pathlib import Path
 
 import yaml
 
 from .config import ConnectorConfig, ForgeConfig, ProjectConfig
 
+# Prefer the LibYAML-backed C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +34,7 @@ class ProjectRegistry:
             raise FileNotFoundError(f"Config file not found: {config_path}")
 
         with open(path) as f:
-            raw = yaml.safe_load(f)
+            raw = yaml.load(f, Loader=SafeLoader)
 
         if raw is None:
             raw = {}
@@ -37,8 +45,6 @@ class ProjectRegistry:
 
     def _migrate_legacy_telegram(self) -> None:
         """Auto-create a connector entry from legacy telegram config."""
-        import os
-
         token = (
             os.environ.get("AGENT_FORGE_TELEGRAM_TOKEN")
             or self.config.telegram.bot_token
@@ -56,11 +62,16 @@ class ProjectRegistry:
         """Validate that all project paths exist and are git repos."""
         errors: list[str] = []
         for name, project in self.config.projects.items():
-            project_path = Path(project.path)
-            if not project_path.exists():
-                errors.append(f"Project '{name}': path does not exist: {project.path}")
+            # A present .git implies the project path exists, so the common
+            # case costs one stat; the path itself is only checked on failure.
+            try:
+                os.stat(os.path.join(project.path, ".git"))
                 continue
-            if not (project_path / ".git").exists():
+            except OSError:
+                pass
+            if not os.path.exists(project.path):
+                errors.append(f"Project '{name}': path does not exist: {project.path}")
+            else:
                 errors.append(
                     f"Project '{name}': not a git repo (no .git): {project.path}"
                 )
@@ -79,13 +90,16 @@ class ProjectRegistry:
         return dict(self.config.projects)
 
     def save(self) -> None:
-        """Write current config back to YAML and reload from disk."""
+        """Write current config back to YAML.
+
+        self.config stays the source of truth (and the same object callers
+        hold); use reload() to pick up edits made to the file by hand.
+        """
         path = Path(self.config_path)
         data = self.config.model_dump()
         with open(path, "w") as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+            yaml.dump(data, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
         logger.info("Saved config to %s", self.config_path)
-        self.reload()
 
     def reload(self) -> None:
         """Re-read config.yaml (for hot-reload)."""
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
+import random
 import re
+from collections import OrderedDict
+from collections.abc import Iterator
 from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any
 
 import httpx
 
@@ -37,7 +44,6 @@ _NOISE_RE = re.compile(
     r"|^\s*⏵"
     r"|^\s*[❯>]\s+\S"
     r"|^\s*[✢-✿]"
-    r"|.*\bChannelling\b"                      # Claude Code "Channelling…" status
     r"|^\s*⏺\s*$"                              # Claude Code bare status dot (no content after)
     r"|^\s*[·.…↑↓←→]{1,}\s*$"                 # terminal artifacts: arrows, dots, middots
     r"|^\s*·\s+\S+…\s*$"                      # Claude Code churning status (e.g. "· Scurrying…")
@@ -55,14 +61,32 @@ _NOISE_RE = re.compile(
     r"|^\s*\[[\w/.:-]+\s+[0-9a-f]{7,}\]"      # git commit output [branch hash] message
 )
 
+# Claude Code "Channelling…" status. Kept out of _NOISE_RE: as a ".*"
+# alternative it rescanned every line that no anchored branch rejected,
+# and was the bulk of the per-line match cost.
+_CHANNELLING_RE = re.compile(r"\bChannelling\b")
+
 _BLOCK_MARKER_RE = re.compile(r"^\s*⏺\s?")
 
-_TOOL_HEADER_RE = re.compile(
-    r"^(?:Bash|Read|Edit|Write|Grep|Glob|Task|MultiEdit|NotebookEdit|"
-    r"WebFetch|WebSearch|AskUser|Skill|EnterPlan|ExitPlan)\("
-)
+# Budget for the text sent to the extraction model. The byte cap only
+# binds for non-ASCII output (CJK, box drawing, emoji), where each char
+# costs more bytes and tokens than the ASCII the char cap is sized for.
+_PREPROCESS_MAX_CHARS = 10_000
+_PREPROCESS_MAX_BYTES = 16 * 1024
 
-_TOOL_OUTPUT_RE = re.compile(r"^\s*⎿")
+# Only this much of the end of a capture is scanned: ~25x the 10K-char
+# preprocess budget, so the result is unaffected unless nearly all of
+# the tail is noise.
+_SCAN_WINDOW_CHARS = 256 * 1024
+
+# Literal prefixes, checked with str.startswith rather than a regex
+_TOOL_HEADER_PREFIXES = (
+    "Bash(", "Read(", "Edit(", "Write(", "Grep(", "Glob(", "Task(", "MultiEdit(",
+    "NotebookEdit(", "WebFetch(", "WebSearch(", "AskUser(", "Skill(", "EnterPlan(",
+    "ExitPlan(",
+)
+_TOOL_OUTPUT_MARKER = "⎿"
+_BLOCK_MARKER = "⏺"
 
 _SYSTEM_PROMPT = (
     "You are extracting an AI coding agent's response from raw terminal output. "
@@ -92,58 +116,85 @@ _SYSTEM_PROMPT = (
 )
 
 
-def _strip_tool_blocks(lines: list[str]) -> list[str]:
-    """Remove Claude Code tool call blocks (header + ⎿ output lines).
+def strip_ansi(text: str) -> str:
+    """Remove terminal escape sequences (CSI, OSC, charset and simple ESC)."""
+    # Every sequence starts with ESC: a plain find skips clean input, and
+    # the clean prefix before the first escape, without running the regex
+    start = text.find("\x1b")
+    if start < 0:
+        return text
+    return text[:start] + _ANSI_RE.sub("", text[start:])
 
-    A tool block starts with a tool invocation header (e.g. 'Bash(...)')
-    and includes all subsequent lines starting with '⎿' (tool output marker).
-    """
-    result: list[str] = []
-    in_tool_block = False
-    for line in lines:
-        if _TOOL_HEADER_RE.match(line):
-            in_tool_block = True
-            continue
-        if in_tool_block:
-            if _TOOL_OUTPUT_RE.match(line):
-                continue
-            # Also skip expand hints within tool blocks
-            stripped = line.strip()
-            if stripped.startswith("…") and "lines" in stripped and "ctrl+o" in stripped:
-                continue
-            in_tool_block = False
-        result.append(line)
-    return result
 
+def _scan_window(raw: str) -> str:
+    """Return the last _SCAN_WINDOW_CHARS of raw, starting on a line boundary."""
+    if len(raw) <= _SCAN_WINDOW_CHARS:
+        return raw
+    cut = len(raw) - _SCAN_WINDOW_CHARS
+    newline = raw.find("\n", cut)
+    return raw[newline + 1:] if newline >= 0 else raw[cut:]
 
-def _dedup_consecutive(lines: list[str]) -> list[str]:
-    """Remove consecutive duplicate lines (terminal redraws)."""
-    if not lines:
-        return lines
-    result = [lines[0]]
-    for line in lines[1:]:
-        if line.strip() != result[-1].strip():
-            result.append(line)
-    return result
+
+def _is_noise(line: str) -> bool:
+    """True for spinner, status, tool and other non-response lines."""
+    if _NOISE_RE.match(line):
+        return True
+    return "Channelling" in line and _CHANNELLING_RE.search(line) is not None
+
+
+def _iter_meaningful_reversed(lines: list[str]) -> Iterator[str]:
+    """Yield the meaningful lines of ``lines``, last to first.
+
+    One pass does what used to be separate list passes: drop blank lines,
+    strip the ⏺ block marker, drop noise, and collapse consecutive
+    duplicates (terminal redraws). Of a duplicate run the earliest line is
+    the one yielded, as a forward dedup would keep it. Tool call headers
+    and their ⎿ output lines are all noise, so whole tool blocks
+    fall out here too. Callers stop iterating once they have enough tail.
+    """
+    # Bound methods as locals: this loop runs once per captured line
+    noise_match = _NOISE_RE.match
+    channelling_search = _CHANNELLING_RE.search
+    marker_sub = _BLOCK_MARKER_RE.sub
+    pending: str | None = None
+    pending_key: str | None = None
+    for line in reversed(lines):
+        if _BLOCK_MARKER in line:
+            line = marker_sub("", line)
+        key = line.strip()
+        if not key or noise_match(line):
+            continue
+        if "Channelling" in line and channelling_search(line):
+            continue
+        if key == pending_key:
+            pending = line
+            continue
+        if pending is not None:
+            yield pending
+        pending, pending_key = line, key
+    if pending is not None:
+        yield pending
 
 
 def preprocess_output(raw: str) -> str:
-    """Strip ANSI codes, filter noise, and take the last ~10K chars of meaningful content."""
-    cleaned = _ANSI_RE.sub("", raw)
-    lines = [ln for ln in cleaned.splitlines() if ln.strip()]
-    # Strip Claude Code block marker (⏺) prefix — preserve the text that follows
-    lines = [_BLOCK_MARKER_RE.sub("", ln) for ln in lines]
-    lines = [ln for ln in lines if ln.strip()]
-    meaningful = [ln for ln in lines if not _NOISE_RE.match(ln)]
-    meaningful = _dedup_consecutive(meaningful)
-    meaningful = _strip_tool_blocks(meaningful)
+    """Strip ANSI codes, filter noise, and keep the last ~10K chars of meaningful content."""
+    # ANSI stripping runs before the line split: OSC sequences may span lines
+    cleaned = strip_ansi(_scan_window(raw))
     result_lines: list[str] = []
-    total = 0
-    for line in reversed(meaningful):
-        if total + len(line) + 1 > 10000:
+    total_chars = 0
+    total_bytes = 0
+    for line in _iter_meaningful_reversed(cleaned.splitlines()):
+        chars = len(line) + 1
+        size = chars if line.isascii() else len(line.encode("utf-8")) + 1
+        if (
+            total_chars + chars > _PREPROCESS_MAX_CHARS
+            or total_bytes + size > _PREPROCESS_MAX_BYTES
+        ):
             break
-        result_lines.insert(0, line)
-        total += len(line) + 1
+        result_lines.append(line)
+        total_chars += chars
+        total_bytes += size
+    result_lines.reverse()
     return "\n".join(result_lines)
 
 
@@ -154,7 +205,7 @@ def extract_response_regex(raw: str) -> ExtractionResult:
     sections that aren't tool calls. Falls back to last 30 meaningful
     lines with 200-char line truncation.
     """
-    cleaned = _ANSI_RE.sub("", raw)
+    cleaned = strip_ansi(_scan_window(raw))
     lines = [ln for ln in cleaned.splitlines() if ln.strip()]
 
     # Try block-based extraction first: find the last ⏺ text block
@@ -163,10 +214,9 @@ def extract_response_regex(raw: str) -> ExtractionResult:
     for i in range(len(lines) - 1, -1, -1):
         stripped = lines[i].strip()
         # Check for ⏺ followed by text (not a tool call)
-        marker_match = _BLOCK_MARKER_RE.match(stripped)
-        if marker_match:
-            after_marker = _BLOCK_MARKER_RE.sub("", stripped).strip()
-            if after_marker and not _TOOL_HEADER_RE.match(after_marker):
+        if stripped.startswith(_BLOCK_MARKER):
+            after_marker = stripped[1:].strip()
+            if after_marker and not after_marker.startswith(_TOOL_HEADER_PREFIXES):
                 last_response_start = i
                 break
 
@@ -181,38 +231,150 @@ def extract_response_regex(raw: str) -> ExtractionResult:
                 line = _BLOCK_MARKER_RE.sub("", line)
                 if not line.strip():
                     continue
-            elif _BLOCK_MARKER_RE.match(stripped):
+            elif stripped.startswith(_BLOCK_MARKER):
                 # Next block — check if it's a continuation or new block
-                after = _BLOCK_MARKER_RE.sub("", stripped).strip()
-                if _TOOL_HEADER_RE.match(after):
+                after = stripped[1:].strip()
+                if after.startswith(_TOOL_HEADER_PREFIXES):
                     break  # Tool call block — stop
                 if after:
                     break  # Another text block — stop
                 continue  # Bare ⏺ — skip
-            elif _TOOL_HEADER_RE.match(stripped):
+            elif stripped.startswith(_TOOL_HEADER_PREFIXES):
                 break
-            elif _TOOL_OUTPUT_RE.match(stripped):
+            elif stripped.startswith(_TOOL_OUTPUT_MARKER):
                 break
             # Filter noise within the block
-            if _NOISE_RE.match(line):
+            if _is_noise(line):
                 continue
             block_lines.append(line[:200])
 
         if block_lines:
             return ExtractionResult(text="\n".join(block_lines))
 
-    # Fallback: strip tool blocks and take last 30 lines
-    lines = [_BLOCK_MARKER_RE.sub("", ln) for ln in lines]
-    lines = [ln for ln in lines if ln.strip()]
-    meaningful = [ln for ln in lines if not _NOISE_RE.match(ln)]
-    meaningful = _dedup_consecutive(meaningful)
-    meaningful = _strip_tool_blocks(meaningful)
-    if not meaningful:
-        return ExtractionResult(text="")
-    tail = [ln[:200] for ln in meaningful[-30:]]
+    # Fallback: last 30 meaningful lines (tool blocks are noise)
+    tail = [ln[:200] for ln in islice(_iter_meaningful_reversed(lines), 30)]
+    tail.reverse()
     return ExtractionResult(text="\n".join(tail))
 
 
+# One client for the process, so repeated extractions reuse pooled
+# connections instead of paying a TCP + TLS handshake each time
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared API client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient()
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared API client. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# A file name with an extension ("a.png", "./out/report.pdf"); an answer
+# naming one may point at a file to attach, which only the model extracts
+_FILE_NAME_RE = re.compile(r"\b[\w-]+\.[A-Za-z][A-Za-z0-9]{1,4}\b")
+
+
+def _extract_simple(raw: str) -> ExtractionResult | None:
+    """Regex-extract captures with one ⏺ text block and no tool calls.
+
+    Such a capture is just the agent's answer, with nothing for the model
+    to separate from tool output.  Answers that name a file still go to
+    the model, which also picks out files to attach (possibly ones made in
+    an earlier turn).  Returns None when the capture needs the model.
+    """
+    blocks = 0
+    for line in strip_ansi(_scan_window(raw)).splitlines():
+        stripped = line.strip()
+        if stripped.startswith(_BLOCK_MARKER):
+            stripped = stripped[1:].strip()
+            if not stripped:
+                continue
+            if stripped.startswith(_TOOL_HEADER_PREFIXES):
+                return None
+            blocks += 1
+            if blocks > 1:
+                return None
+        elif stripped.startswith(_TOOL_HEADER_PREFIXES) or stripped.startswith(_TOOL_OUTPUT_MARKER):
+            return None
+    if blocks != 1:
+        return None
+    result = extract_response_regex(raw)
+    if not result.text or _FILE_NAME_RE.search(result.text):
+        return None
+    return result
+
+
+# Recent successful extractions, least recently used first
+_RESULT_CACHE_SIZE = 128
+_result_cache: OrderedDict[tuple[bytes, str, int], ExtractionResult] = OrderedDict()
+
+# Overload / gateway statuses worth another attempt, with backoff
+_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+_MAX_ATTEMPTS = 3
+_MAX_RETRY_DELAY = 10.0
+
+
+def _retry_delay(resp: httpx.Response | None, attempt: int) -> float:
+    """Seconds to wait before retry number ``attempt + 1``.
+
+    Honours a numeric Retry-After header, otherwise backs off 1s, 2s, ...
+    with a little jitter so concurrent relays do not retry in lockstep.
+    """
+    if resp is not None:
+        try:
+            return min(float(resp.headers["retry-after"]), _MAX_RETRY_DELAY)
+        except (KeyError, ValueError):
+            pass
+    return min(2.0**attempt, 4.0) + random.uniform(0, 0.25)
+
+
+async def _post_with_retry(
+    client: httpx.AsyncClient, url: str, *, timeout: float, **kwargs: Any
+) -> httpx.Response:
+    """POST, retrying retryable statuses and failed connects.
+
+    ``timeout`` bounds all attempts and the waits between them together, so
+    a relay that keeps answering 429/503 cannot hold up the poll for longer
+    than one request would.  Once attempts or time run out the last response
+    is returned, or the last connect error raised, for the caller to handle
+    as before.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt_timeout = timeout
+    attempt = 0
+    while True:
+        resp: httpx.Response | None = None
+        try:
+            resp = await client.post(url, timeout=attempt_timeout, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            delay = _retry_delay(None, attempt)
+            if attempt + 1 >= _MAX_ATTEMPTS or loop.time() + delay >= deadline:
+                raise
+        else:
+            if resp.status_code not in _RETRY_STATUS_CODES:
+                return resp
+            delay = _retry_delay(resp, attempt)
+            if attempt + 1 >= _MAX_ATTEMPTS or loop.time() + delay >= deadline:
+                return resp
+        logger.debug(
+            "Response extractor retrying in %.1fs (%s)",
+            delay, resp.status_code if resp is not None else "connect failed",
+        )
+        await asyncio.sleep(delay)
+        attempt_timeout = deadline - loop.time()
+        attempt += 1
+
+
 async def extract_response(
     raw_output: str,
     *,
@@ -221,12 +383,22 @@ async def extract_response(
     max_tokens: int = 4000,
     timeout: float = 15.0,
     user_question: str = "",
+    force_llm: bool = False,
 ) -> ExtractionResult | None:
     """Call the Anthropic Messages API to extract the agent's response from terminal output.
 
+    A capture holding a single ⏺ text block and no tool calls is extracted
+    locally without an API call, unless force_llm is set.
+
     Returns an ExtractionResult with the extracted text and any file paths, or None on failure.
     """
-    preprocessed = preprocess_output(raw_output)
+    if not force_llm:
+        simple = await asyncio.to_thread(_extract_simple, raw_output)
+        if simple is not None:
+            return simple
+
+    # Filtering a full scrollback capture is CPU work; keep it off the event loop
+    preprocessed = await asyncio.to_thread(preprocess_output, raw_output)
     if not preprocessed.strip():
         return None
 
@@ -235,45 +407,61 @@ async def extract_response(
         user_content += f"The user asked: '{user_question}'\n\n"
     user_content += f"```\n{preprocessed}\n```"
 
+    # The same pane is often extracted again (repeated WORKING -> IDLE
+    # cycles); an identical prompt gets the cached answer
+    cache_key = (
+        hashlib.blake2b(user_content.encode(), digest_size=16).digest(), model, max_tokens,
+    )
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        _result_cache.move_to_end(cache_key)
+        return cached
+
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json={
-                    "model": model,
-                    "max_tokens": max_tokens,
-                    "system": _SYSTEM_PROMPT,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": user_content,
-                        }
-                    ],
-                },
+        resp = await _post_with_retry(
+            _get_client(),
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": model,
+                "max_tokens": max_tokens,
+                "system": _SYSTEM_PROMPT,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": user_content,
+                    }
+                ],
+            },
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        blocks = data.get("content", [])
+        text_parts = [b["text"] for b in blocks if b.get("type") == "text"]
+        if not text_parts:
+            return None
+        raw_text = "\n".join(text_parts).strip()
+        try:
+            parsed = json.loads(raw_text)
+            result = ExtractionResult(
+                text=parsed.get("text", raw_text),
+                file_paths=parsed.get("files", []),
             )
-            resp.raise_for_status()
-            data = resp.json()
-            blocks = data.get("content", [])
-            text_parts = [b["text"] for b in blocks if b.get("type") == "text"]
-            if not text_parts:
-                return None
-            raw_text = "\n".join(text_parts).strip()
-            try:
-                parsed = json.loads(raw_text)
-                return ExtractionResult(
-                    text=parsed.get("text", raw_text),
-                    file_paths=parsed.get("files", []),
-                )
-            except (json.JSONDecodeError, TypeError):
-                return ExtractionResult(text=raw_text)
+        except (json.JSONDecodeError, TypeError):
+            result = ExtractionResult(text=raw_text)
     except httpx.TimeoutException:
         logger.debug("Response extractor timed out after %.1fs", timeout)
         return None
     except Exception:
         logger.debug("Response extractor failed", exc_info=True)
         return None
+
+    _result_cache[cache_key] = result
+    if len(_result_cache) > _RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+    return result
@@ -14,8 +14,13 @@ from . import tmux_utils
 from .agent_manager import AgentManager, AgentStatus
 from .config import ForgeConfig
 from .connectors.base import ActionButton
-from .database import log_event, save_snapshot
-from .response_extractor import ExtractionResult, extract_response, extract_response_regex
+from .database import log_event, save_snapshots
+from .response_extractor import (
+    ExtractionResult,
+    extract_response,
+    extract_response_regex,
+    strip_ansi,
+)
 from .summarizer import summarize_output
 from .websocket_manager import WebSocketManager
 
@@ -39,12 +44,109 @@ _ERROR_PATTERNS: list[re.Pattern[str]] = [
     re.compile(r"\bFAILED\b"),
 ]
 
+# Substrings every match of the family above contains, after casefold()
+# (FAILED is case-sensitive and checked as is); when none is present the
+# family's regexes cannot match and are skipped
+_INPUT_LITERALS = ("allow", "y/n", "yes/no", "do you want")
+_ERROR_LITERALS = ("error:", "fatal:")
+
 # Patterns that indicate the agent is idle at a prompt
 _IDLE_PROMPT_PATTERNS: list[re.Pattern[str]] = [
     re.compile(r"[>❯]\s*$"),
     re.compile(r"\$\s*$"),
 ]
 
+# A pane tmux reports no output for is not re-captured, up to this many
+# polls in a row; the periodic capture picks up changes that produce no
+# output, such as a reflow after a client resize.
+_MAX_SKIPPED_CAPTURES = 10
+
+# An agent whose state has not changed is not re-saved or re-broadcast, up
+# to this many polls in a row; the periodic publish refreshes dashboards
+# that reconnected in between.
+_MAX_SKIPPED_PUBLISHES = 10
+
+# A plain "old -> new" status notice is sent once the new status has held
+# for this many polls in a row, so an agent flapping between two states
+# does not flood IM.  Prompts and response relays are sent immediately.
+_NOTICE_STABLE_POLLS = 2
+
+# Statuses detect_status derives from the output alone; an agent in one of
+# these is not re-detected while its capture is unchanged.  WORKING depends
+# on the previous capture, and STARTING/STOPPED are never detected at all.
+_SETTLED_STATUSES = frozenset(
+    {AgentStatus.IDLE, AgentStatus.WAITING_INPUT, AgentStatus.ERROR}
+)
+
+
+def _published_state(agent: Any) -> tuple:
+    """Fields of an agent that end up in its snapshot row or update message."""
+    return (
+        agent.status,
+        agent.last_output,
+        agent.last_activity,
+        agent.task_description,
+        agent.sub_agent_count,
+        agent.needs_attention,
+        agent.parked,
+        agent.last_response,
+        agent.last_user_message,
+    )
+
+# Prompt lines, spinner artifacts, separators and UI chrome dropped from
+# activity summaries
+_ACTIVITY_NOISE_RE = re.compile(
+    r"^\s*[>❯$#]\s*$"                  # bare prompt chars
+    r"|^\s*[⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏⣾⣽⣻⢿⡿⣟⣯⣷]"  # Unicode spinners
+    r"|^\s*[|/\-\\]\s\S.{0,30}$"       # ASCII spinners (short lines only)
+    r"|^[\s─━─=~_*]{6,}$"              # separator lines
+    r"|^[\s\-]{6,}$"                    # dash-only separator lines
+    r"|^\s*⏵"                           # Claude Code UI chrome (bypass toggle)
+    r"|^\s*[❯>]\s+\S"                  # Claude Code tool invocations (❯ command)
+    r"|^\s*[✢-✿]"                      # Claude Code thinking/churning indicator
+    r"|^\s*⏺\s*$"                       # Claude Code bare status dot (no content after)
+    r"|^\s*[·.…↑↓←→]{1,}\s*$"          # terminal artifacts: arrows, dots, middots
+    r"|^\s*·\s+\S+…\s*$"              # Claude Code churning status (e.g. "· Scurrying…")
+    r"|^\s*\S{1,4}\s*$"                 # very short (1-4 char) fragment lines
+    r"|^\s*\w+…\s*$"                    # single-word status text ending in …
+    r"|^\s*\w*\(thinking\)\s*$"         # Claude thinking indicator (e.g. "ai(thinking)")
+)
+
+# Claude Code "Channelling…" status, anywhere in the line.  Kept out of
+# _ACTIVITY_NOISE_RE: a leading ".*" branch walks every line that no other
+# branch rejects.
+_CHANNELLING_RE = re.compile(r"\bChannelling\b")
+
+# Every _ACTIVITY_NOISE_RE branch needs one of these as the first visible
+# character, at most four visible characters, or a line ending in "…" or
+# ")"; lines with none of the three cannot match and skip the regex
+_NOISE_LEADS = frozenset(
+    ">❯$#|/-\\─━=~_*⏵⏺·.…↑↓←→⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏⣾⣽⣻⢿⡿⣟⣯⣷"
+    + "".join(map(chr, range(ord("✢"), ord("✿") + 1)))
+)
+
+
+def _is_activity_noise(line: str) -> bool:
+    """True for prompt, spinner, separator and Claude Code status lines."""
+    text = line.strip()
+    if len(text) <= 4 or text[0] in _NOISE_LEADS or text[-1] in "…)":
+        if _ACTIVITY_NOISE_RE.match(line):
+            return True
+    return "Channelling" in line and _CHANNELLING_RE.search(line) is not None
+
+
+def _last_lines(text: str, count: int) -> str:
+    """Return the last ``count`` lines of text.
+
+    Walks back with rfind so a long capture is neither split nor copied.
+    """
+    start = len(text)
+    for _ in range(count):
+        start = text.rfind("\n", 0, start)
+        if start < 0:
+            return text
+    return text[start + 1 :]
+
 
 class StatusMonitor:
     """Periodically polls tmux sessions and pushes status updates via WebSocket."""
@@ -67,6 +169,13 @@ class StatusMonitor:
         self._running = False
         self._task: asyncio.Task | None = None
         self._resized_sessions: set[str] = set()
+        # agent id -> (time of last real capture, polls skipped since)
+        self._captures: dict[str, tuple[float, int]] = {}
+        # agent id -> (state last saved and broadcast, polls skipped since)
+        self._published: dict[str, tuple[tuple, int]] = {}
+        # agent id -> (status before, status after, polls it has held) for a
+        # transition whose notice waits for _NOTICE_STABLE_POLLS
+        self._pending_notices: dict[str, tuple[AgentStatus, AgentStatus, int]] = {}
         self.metrics_collector: object | None = None
         self._last_metrics_collect: float = 0.0
         self.claude_usage_collector: object | None = None
@@ -78,7 +187,9 @@ class StatusMonitor:
             try:
                 from .metrics_collector import MetricsCollector
                 self.metrics_collector = MetricsCollector(
-                    enable_gpu=config.defaults.metrics.enable_gpu
+                    enable_gpu=config.defaults.metrics.enable_gpu,
+                    gpu_poll_interval=config.defaults.metrics.gpu_poll_interval_seconds,
+                    history_size=config.defaults.metrics.history_size,
                 )
                 logger.info("MetricsCollector initialized")
             except ImportError:
@@ -111,75 +222,83 @@ class StatusMonitor:
                 logger.exception("Error in status monitor poll")
             await asyncio.sleep(self.poll_interval)
 
-    async def _poll(self) -> None:
-        for agent in self.agent_manager.list_agents():
-            if agent.status == AgentStatus.STOPPED:
-                continue
+    def _capture_is_current(self, agent: Any, activity: dict[str, int] | None) -> bool:
+        """True if tmux saw no output from the agent's pane since its last capture."""
+        last = self._captures.get(agent.id)
+        if activity is None or last is None:
+            return False
+        captured_at, skipped = last
+        active_at = activity.get(agent.session_name)
+        # window_activity has 1s resolution: only output from a second
+        # strictly before the last capture started is known to be in it
+        return active_at is not None and active_at < int(captured_at) and skipped < _MAX_SKIPPED_CAPTURES
+
+    def _capture(self, agent: Any, activity: dict[str, int] | None) -> str:
+        """Capture the agent's pane, or reuse the last capture if tmux saw no output since."""
+        if self._capture_is_current(agent, activity):
+            captured_at, skipped = self._captures[agent.id]
+            self._captures[agent.id] = (captured_at, skipped + 1)
+            return agent.last_output
+
+        captured_at = time.time()
+        output = tmux_utils.capture_pane(agent.session_name, lines=5000)
+        self._captures[agent.id] = (captured_at, 0)
+        return output
+
+    def _prefetch_captures(
+        self, agents: list[Any], activity: dict[str, int] | None
+    ) -> dict[str, str]:
+        """Capture every live pane due for a capture in one tmux call, keyed by agent id.
+
+        Returns an empty dict when there is nothing to batch or the batch
+        fails; those agents are then captured one by one as usual.
+        """
+        if activity is None:
+            return {}
+        due = [
+            agent for agent in agents
+            if agent.session_name in activity and not self._capture_is_current(agent, activity)
+        ]
+        if len(due) < 2:
+            return {}
 
-            # Resize legacy sessions that were created with default 80-column width
-            if agent.session_name not in self._resized_sessions:
-                tmux_utils.resize_window(agent.session_name)
-                self._resized_sessions.add(agent.session_name)
+        captured_at = time.time()
+        outputs = tmux_utils.capture_panes([agent.session_name for agent in due], lines=5000)
+        if outputs is None:
+            return {}
+        for agent in due:
+            self._captures[agent.id] = (captured_at, 0)
+        return {agent.id: outputs[agent.session_name] for agent in due}
 
-            output = tmux_utils.capture_pane(agent.session_name, lines=5000)
+    async def _poll(self) -> None:
+        agents = self.agent_manager.list_agents()
+        activity = await asyncio.to_thread(tmux_utils.list_pane_activity)
+        live_ids = {agent.id for agent in agents}
+        for agent_id in self._captures.keys() - live_ids:
+            del self._captures[agent_id]
+        for agent_id in self._published.keys() - live_ids:
+            del self._published[agent_id]
+        for agent_id in self._pending_notices.keys() - live_ids:
+            del self._pending_notices[agent_id]
+
+        # Agents are independent: one agent's relay or summary API call
+        # must not hold up the others
+        polled = [agent for agent in agents if agent.status != AgentStatus.STOPPED]
+        prefetched = await asyncio.to_thread(self._prefetch_captures, polled, activity)
+        results = await asyncio.gather(
+            *(self._poll_agent(agent, activity, prefetched.get(agent.id)) for agent in polled),
+            return_exceptions=True,
+        )
+        changed = []
+        for agent, result in zip(polled, results):
+            if isinstance(result, Exception):
+                logger.error("Error polling agent %s", agent.id, exc_info=result)
+            elif result:
+                changed.append(agent)
 
-            if not tmux_utils.session_exists(agent.session_name):
-                old_status = agent.status
-                agent.status = AgentStatus.STOPPED
-                agent.needs_attention = True
-                agent.parked = False
-                if old_status != AgentStatus.STOPPED and self.db:
-                    await log_event(
-                        self.db, agent.id, agent.project_name,
-                        "status_change", {"status": AgentStatus.STOPPED.value},
-                    )
-                    if old_status == AgentStatus.WORKING:
-                        await self._relay_response(agent, output)
-                    msg = f"Agent `{agent.id}` ({agent.project_name}) stopped"
-                    summary = await self._get_activity_summary(
-                        agent.last_output or "",
-                    )
-                    if summary:
-                        msg += f"\n```\n{summary}\n```"
-                    await self._notify_channels(agent.project_name, msg)
-            else:
-                new_status = self.detect_status(output, agent.last_output)
-                if new_status != agent.status:
-                    old_status = agent.status
-                    agent.status = new_status
-
-                    # Set attention flags based on status transitions
-                    if new_status in (AgentStatus.IDLE, AgentStatus.WAITING_INPUT, AgentStatus.ERROR):
-                        agent.needs_attention = True
-                        agent.parked = False
-                    elif new_status == AgentStatus.WORKING:
-                        agent.needs_attention = False
-
-                    if self.db:
-                        await log_event(
-                            self.db, agent.id, agent.project_name,
-                            "status_change", {"status": new_status.value},
-                        )
-                    if new_status == AgentStatus.WAITING_INPUT:
-                        await self._notify_waiting_input(
-                            agent.id, agent.project_name, output,
-                        )
-                    elif new_status != AgentStatus.WORKING:
-                        if new_status == AgentStatus.IDLE and old_status == AgentStatus.WORKING:
-                            await self._relay_response(agent, output)
-                        else:
-                            msg = f"Agent `{agent.id}` ({agent.project_name}): {old_status.value} -> {new_status.value}"
-                            summary = await self._get_activity_summary(output)
-                            if summary:
-                                msg += f"\n```\n{summary}\n```"
-                            await self._notify_channels(agent.project_name, msg)
-
-            agent.last_output = output
-
-            if self.db:
-                await save_snapshot(self.db, agent)
-
-            await self.ws_manager.broadcast_agent_update(agent)
+        # One transaction for every agent that changed this poll
+        if changed and self.db:
+            await save_snapshots(self.db, changed)
 
         # Collect and broadcast metrics at configured interval
         if self.metrics_collector:
@@ -204,6 +323,110 @@ class StatusMonitor:
                     logger.exception("Claude usage collection failed")
                 self._last_claude_usage_collect = now_cu
 
+    async def _poll_agent(
+        self, agent: Any, activity: dict[str, int] | None, prefetched: str | None = None
+    ) -> bool:
+        """Capture one agent's pane, update its status and broadcast it.
+
+        ``prefetched`` is the agent's capture from a batched tmux call, if
+        it was part of one.  Returns whether the agent's snapshot needs
+        saving.
+        """
+        # Resize legacy sessions that were created with default 80-column width
+        if agent.session_name not in self._resized_sessions:
+            tmux_utils.resize_window(agent.session_name)
+            self._resized_sessions.add(agent.session_name)
+
+        # tmux calls are blocking subprocesses; run them off the event loop
+        if activity is not None:
+            # The pane listing doubles as the existence check
+            alive = agent.session_name in activity
+            if prefetched is not None:
+                output = prefetched
+            elif alive:
+                output = await asyncio.to_thread(self._capture, agent, activity)
+            else:
+                output = ""
+        else:
+            output = await asyncio.to_thread(self._capture, agent, activity)
+            alive = await asyncio.to_thread(tmux_utils.session_exists, agent.session_name)
+
+        # A transition still waiting to be announced; dropped below if the
+        # status moved on again this poll
+        pending = self._pending_notices.pop(agent.id, None)
+
+        if not alive:
+            old_status = agent.status
+            agent.status = AgentStatus.STOPPED
+            agent.needs_attention = True
+            agent.parked = False
+            if old_status != AgentStatus.STOPPED and self.db:
+                await log_event(
+                    self.db, agent.id, agent.project_name,
+                    "status_change", {"status": AgentStatus.STOPPED.value},
+                )
+                if old_status == AgentStatus.WORKING:
+                    await self._relay_response(agent, output)
+                msg = f"Agent `{agent.id}` ({agent.project_name}) stopped"
+                summary = await self._get_activity_summary(
+                    agent.last_output or "",
+                )
+                if summary:
+                    msg += f"\n```\n{summary}\n```"
+                await self._notify_channels(agent.project_name, msg)
+        elif output != agent.last_output or agent.status not in _SETTLED_STATUSES:
+            # Unchanged output yields the settled status it produced last poll
+            new_status = self.detect_status(output, agent.last_output)
+            if new_status != agent.status:
+                old_status = agent.status
+                agent.status = new_status
+
+                # Set attention flags based on status transitions
+                if new_status in (AgentStatus.IDLE, AgentStatus.WAITING_INPUT, AgentStatus.ERROR):
+                    agent.needs_attention = True
+                    agent.parked = False
+                elif new_status == AgentStatus.WORKING:
+                    agent.needs_attention = False
+
+                if self.db:
+                    await log_event(
+                        self.db, agent.id, agent.project_name,
+                        "status_change", {"status": new_status.value},
+                    )
+                if new_status == AgentStatus.WAITING_INPUT:
+                    await self._notify_waiting_input(
+                        agent.id, agent.project_name, output,
+                    )
+                elif new_status != AgentStatus.WORKING:
+                    if new_status == AgentStatus.IDLE and old_status == AgentStatus.WORKING:
+                        await self._relay_response(agent, output)
+                    else:
+                        pending = (old_status, new_status, 0)
+
+        if pending is not None and pending[1] == agent.status:
+            old_status, new_status, held = pending
+            held += 1
+            if held < _NOTICE_STABLE_POLLS:
+                self._pending_notices[agent.id] = (old_status, new_status, held)
+            else:
+                msg = f"Agent `{agent.id}` ({agent.project_name}): {old_status.value} -> {new_status.value}"
+                summary = await self._get_activity_summary(output)
+                if summary:
+                    msg += f"\n```\n{summary}\n```"
+                await self._notify_channels(agent.project_name, msg)
+
+        agent.last_output = output
+
+        state = _published_state(agent)
+        published = self._published.get(agent.id)
+        if published is not None and published[0] == state and published[1] < _MAX_SKIPPED_PUBLISHES:
+            self._published[agent.id] = (state, published[1] + 1)
+            return False
+        self._published[agent.id] = (state, 0)
+
+        await self.ws_manager.broadcast_agent_update(agent)
+        return True
+
     async def _notify_channels(
         self, project_name: str, text: str, media_paths: list[str] | None = None
     ) -> None:
@@ -297,7 +520,7 @@ class StatusMonitor:
                 )
 
         if not result:
-            result = extract_response_regex(output)
+            result = await asyncio.to_thread(extract_response_regex, output)
 
         if not result or not result.text:
             return
@@ -309,11 +532,15 @@ class StatusMonitor:
 
         agent.last_response = result.text
 
-        # Validate file paths — only include paths that exist on disk
+        # Validate file paths — only include paths that exist on disk.
+        # stat() can block on a slow or network filesystem; keep it off the loop
         import os
         valid_media: list[str] | None = None
         if result.file_paths:
-            valid_media = [p for p in result.file_paths if os.path.isfile(p)] or None
+            paths = result.file_paths
+            valid_media = await asyncio.to_thread(
+                lambda: [p for p in paths if os.path.isfile(p)]
+            ) or None
 
         msg = f"Agent `{agent.id}` ({agent.project_name}) response:\n\n{result.text}"
         await self._notify_channels(agent.project_name, msg, media_paths=valid_media)
@@ -328,18 +555,9 @@ class StatusMonitor:
         if not output:
             return ""
 
-        # Strip ANSI escape codes
-        ansi_re = re.compile(
-            r"\x1b"
-            r"(?:"
-            r"\[[0-9;?]*[a-zA-Z]"         # CSI (including DEC private modes)
-            r"|\][^\x07]*\x07"            # OSC terminated by BEL
-            r"|\][^\x1b]*\x1b\\"          # OSC terminated by ST
-            r"|[()#][0-9a-zA-Z]"          # Character set / line attrs
-            r"|[a-zA-Z><=]"               # Simple ESC sequences
-            r")"
-        )
-        cleaned = ansi_re.sub("", output)
+        # Only the last 30 lines are searched; the margin covers lines that
+        # are left blank once escape codes are stripped
+        cleaned = strip_ansi(_last_lines(output.rstrip(), 60))
 
         lines = cleaned.rstrip().splitlines()
         if not lines:
@@ -349,11 +567,12 @@ class StatusMonitor:
         search_lines = lines[-30:]
         match_idx = -1
         for i in range(len(search_lines) - 1, -1, -1):
-            for pattern in _INPUT_PATTERNS:
-                if pattern.search(search_lines[i]):
-                    match_idx = i
-                    break
-            if match_idx >= 0:
+            line = search_lines[i]
+            folded = line.casefold()
+            if not any(literal in folded for literal in _INPUT_LITERALS):
+                continue
+            if any(pattern.search(line) for pattern in _INPUT_PATTERNS):
+                match_idx = i
                 break
 
         if match_idx < 0:
@@ -377,19 +596,15 @@ class StatusMonitor:
         if not output or not output.strip():
             return ""
 
-        ansi_re = re.compile(
-            r"\x1b"
-            r"(?:"
-            r"\[[0-9;?]*[a-zA-Z]"         # CSI (including DEC private modes)
-            r"|\][^\x07]*\x07"            # OSC terminated by BEL
-            r"|\][^\x1b]*\x1b\\"          # OSC terminated by ST
-            r"|[()#][0-9a-zA-Z]"          # Character set / line attrs
-            r"|[a-zA-Z><=]"               # Simple ESC sequences
-            r")"
-        )
-        cleaned = ansi_re.sub("", output)
-
-        lines = [ln for ln in cleaned.splitlines() if ln.strip()]
+        # Strip and split only as much of the capture as it takes to find
+        # 40 non-empty lines, widening the window when blank rows crowd it
+        count = 80
+        while True:
+            window = _last_lines(output, count)
+            lines = [ln for ln in strip_ansi(window).splitlines() if ln.strip()]
+            if len(lines) >= 40 or len(window) == len(output):
+                break
+            count *= 4
         if not lines:
             return ""
 
@@ -397,24 +612,7 @@ class StatusMonitor:
         tail = lines[-40:]
 
         # Filter out prompt lines, spinner artifacts, separators, and UI chrome
-        noise_re = re.compile(
-            r"^\s*[>❯$#]\s*$"                  # bare prompt chars
-            r"|^\s*[⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏⣾⣽⣻⢿⡿⣟⣯⣷]"  # Unicode spinners
-            r"|^\s*[|/\-\\]\s\S.{0,30}$"       # ASCII spinners (short lines only)
-            r"|^[\s─━─=~_*]{6,}$"              # separator lines
-            r"|^[\s\-]{6,}$"                    # dash-only separator lines
-            r"|^\s*⏵"                           # Claude Code UI chrome (bypass toggle)
-            r"|^\s*[❯>]\s+\S"                  # Claude Code tool invocations (❯ command)
-            r"|^\s*[✢-✿]"                      # Claude Code thinking/churning indicator
-            r"|.*\bChannelling\b"               # Claude Code "Channelling…" status
-            r"|^\s*⏺\s*$"                       # Claude Code bare status dot (no content after)
-            r"|^\s*[·.…↑↓←→]{1,}\s*$"          # terminal artifacts: arrows, dots, middots
-            r"|^\s*·\s+\S+…\s*$"              # Claude Code churning status (e.g. "· Scurrying…")
-            r"|^\s*\S{1,4}\s*$"                 # very short (1-4 char) fragment lines
-            r"|^\s*\w+…\s*$"                    # single-word status text ending in …
-            r"|^\s*\w*\(thinking\)\s*$"         # Claude thinking indicator (e.g. "ai(thinking)")
-        )
-        meaningful = [ln for ln in tail if not noise_re.match(ln)]
+        meaningful = [ln for ln in tail if not _is_activity_noise(ln)]
         if not meaningful:
             return ""
 
@@ -439,20 +637,24 @@ class StatusMonitor:
         # Only inspect the last portion of output for prompt/error detection
         tail = output[-2000:]
 
+        folded = tail.casefold()
+
         # 1. Input prompts (highest priority)
-        for pattern in _INPUT_PATTERNS:
-            if pattern.search(tail):
-                return AgentStatus.WAITING_INPUT
+        if any(literal in folded for literal in _INPUT_LITERALS):
+            for pattern in _INPUT_PATTERNS:
+                if pattern.search(tail):
+                    return AgentStatus.WAITING_INPUT
 
         # 2. Error indicators
-        for pattern in _ERROR_PATTERNS:
-            if pattern.search(tail):
-                return AgentStatus.ERROR
+        if "FAILED" in tail or any(literal in folded for literal in _ERROR_LITERALS):
+            for pattern in _ERROR_PATTERNS:
+                if pattern.search(tail):
+                    return AgentStatus.ERROR
 
         # 3. Idle prompt — check the last non-empty line
-        lines = tail.rstrip().splitlines()
-        if lines:
-            last_line = lines[-1]
+        stripped = tail.rstrip()
+        if stripped:
+            last_line = stripped[stripped.rfind("\n") + 1 :]
             for pattern in _IDLE_PROMPT_PATTERNS:
                 if pattern.search(last_line):
                     return AgentStatus.IDLE
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import re
+from collections import OrderedDict
 
 import httpx
 
-logger = logging.getLogger(__name__)
+from .response_extractor import strip_ansi
 
-_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[a-zA-Z]")
+logger = logging.getLogger(__name__)
 
 _NOISE_RE = re.compile(
     r"^\s*[>❯$#]\s*$"                  # bare prompt chars
@@ -32,9 +35,35 @@ _SYSTEM_PROMPT = (
 )
 
 
+# Recent successful summaries, least recently used first
+_SUMMARY_CACHE_SIZE = 256
+_summary_cache: OrderedDict[tuple[bytes, str, int], str] = OrderedDict()
+
+
+# One client for the process, shared by every summary request so status
+# notifications reuse a pooled connection to the API
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared API client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient()
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared API client. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 def _preprocess_output(raw: str) -> str:
     """Strip ANSI codes, filter noise, and take the last 80 meaningful lines."""
-    cleaned = _ANSI_RE.sub("", raw)
+    cleaned = strip_ansi(raw)
     lines = [ln for ln in cleaned.splitlines() if ln.strip()]
     meaningful = [ln for ln in lines if not _NOISE_RE.match(ln)]
     tail = meaningful[-80:]
@@ -53,44 +82,61 @@ async def summarize_output(
 
     Returns the summary string, or None on any failure.
     """
-    preprocessed = _preprocess_output(output)
+    # Noise-filtering every line of a full capture is CPU work; keep it off
+    # the event loop
+    preprocessed = await asyncio.to_thread(_preprocess_output, output)
     if not preprocessed.strip():
         return None
 
+    # Status flapping re-sends the same output; the preprocessed text is
+    # what the API sees, so identical requests share one summary
+    cache_key = (
+        hashlib.blake2b(preprocessed.encode(), digest_size=16).digest(), model, max_tokens,
+    )
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        _summary_cache.move_to_end(cache_key)
+        return cached
+
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json={
-                    "model": model,
-                    "max_tokens": max_tokens,
-                    "system": _SYSTEM_PROMPT,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": (
-                                "Summarize this agent's terminal output:\n\n"
-                                f"```\n{preprocessed}\n```"
-                            ),
-                        }
-                    ],
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            blocks = data.get("content", [])
-            text_parts = [b["text"] for b in blocks if b.get("type") == "text"]
-            if text_parts:
-                return "\n".join(text_parts).strip()
+        resp = await _get_client().post(
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": model,
+                "max_tokens": max_tokens,
+                "system": _SYSTEM_PROMPT,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": (
+                            "Summarize this agent's terminal output:\n\n"
+                            f"```\n{preprocessed}\n```"
+                        ),
+                    }
+                ],
+            },
+            timeout=timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        blocks = data.get("content", [])
+        text_parts = [b["text"] for b in blocks if b.get("type") == "text"]
+        if not text_parts:
             return None
+        summary = "\n".join(text_parts).strip()
     except httpx.TimeoutException:
         logger.debug("Summarizer timed out after %.1fs", timeout)
         return None
     except Exception:
         logger.debug("Summarizer failed", exc_info=True)
         return None
+
+    _summary_cache[cache_key] = summary
+    if len(_summary_cache) > _SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+    return summary
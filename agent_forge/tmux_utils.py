@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 import subprocess
 import time
+import uuid
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -62,6 +63,56 @@ def list_sessions() -> list[TmuxSession]:
     return sessions
 
 
+def list_pane_activity() -> dict[str, int] | None:
+    """Map every session name to its last output time (epoch seconds).
+
+    One tmux call covers all sessions, so a session missing from the map
+    does not exist. Returns None if tmux could not be queried.
+    """
+    try:
+        result = _run(["tmux", "list-panes", "-a", "-F", "#{session_name}\t#{window_activity}"])
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    if result.returncode != 0:
+        return None
+
+    activity: dict[str, int] = {}
+    for line in result.stdout.splitlines():
+        name, _, stamp = line.rpartition("\t")
+        if name and stamp.isdigit():
+            activity[name] = max(activity.get(name, 0), int(stamp))
+    return activity
+
+
+def capture_panes(session_names: list[str], lines: int = 50) -> dict[str, str] | None:
+    """Capture the last N lines of several sessions in one tmux call.
+
+    The captures are chained with ``;`` and told apart by a sentinel line
+    printed after each one.  tmux stops the chain at the first failing
+    command, so None is returned if any session could not be captured;
+    callers fall back to capture_pane().
+    """
+    sentinel = f"forge-capture-{uuid.uuid4().hex}"
+    args = ["tmux"]
+    for name in session_names:
+        if len(args) > 1:
+            args.append(";")
+        args += ["capture-pane", "-t", name, "-p", "-e", "-S", str(-lines)]
+        args += [";", "display-message", "-p", sentinel]
+    try:
+        result = _run(args)
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    if result.returncode != 0:
+        logger.debug("Batched capture failed: %s", result.stderr.strip())
+        return None
+
+    outputs = result.stdout.split(sentinel + "\n")
+    if len(outputs) != len(session_names) + 1:
+        return None
+    return dict(zip(session_names, outputs))
+
+
 def session_exists(name: str) -> bool:
     """Check if a tmux session exists."""
     result = _run(["tmux", "has-session", "-t", name])
@@ -71,10 +71,11 @@ class WebSocketManager:
 
     async def broadcast_metrics(self, snapshot: MetricsSnapshot, claude_usage: dict | None = None) -> None:
         """Broadcast system and agent metrics to all connected clients."""
+        data = snapshot.to_dict()
         msg = {
             "type": "metrics_update",
-            "system": snapshot.system.model_dump(mode="json"),
-            "agents": {k: v.model_dump(mode="json") for k, v in snapshot.agents.items()},
+            "system": data["system"],
+            "agents": data["agents"],
             "total_agents_running": snapshot.total_agents_running,
             "total_agent_memory_mb": snapshot.total_agent_memory_mb,
         }
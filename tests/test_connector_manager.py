@@ -14,6 +14,7 @@ from agent_forge.config import (
 )
 from agent_forge.connectors.base import ActionButton, ConnectorType, InboundMessage, OutboundMessage
 from agent_forge.connectors.manager import ConnectorManager
+from agent_forge.media_handler import MediaType, StagedMedia
 
 
 def _make_mock_agent(
@@ -236,7 +237,7 @@ class TestMediaRouting:
         # Set up media handler mock
         mock_media = MagicMock()
         mock_media.process_and_stage = AsyncMock(
-            return_value=([".media/1000_photo.png"], "image")
+            return_value=(StagedMedia(originals=[".media/1000_photo.png"]), MediaType.IMAGE)
         )
         mock_media.build_media_reference = MagicMock(
             return_value="I've placed design mockups/images at: .media/1000_photo.png. Please analyze them."
@@ -287,7 +288,7 @@ class TestMediaRouting:
 
         mock_media = MagicMock()
         mock_media.process_and_stage = AsyncMock(
-            return_value=([".media/1000_doc.pdf"], "document")
+            return_value=(StagedMedia(originals=[".media/1000_doc.pdf"]), MediaType.DOCUMENT)
         )
         mock_media.build_media_reference = MagicMock(return_value="doc ref")
         connector_manager.media_handler = mock_media
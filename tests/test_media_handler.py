@@ -2,11 +2,13 @@
 
 import asyncio
 import shutil
+import sys
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from agent_forge import media_handler
 from agent_forge.media_handler import (
     AUDIO_EXTENSIONS,
     DOCUMENT_EXTENSIONS,
@@ -14,6 +16,7 @@ from agent_forge.media_handler import (
     VIDEO_EXTENSIONS,
     MediaHandler,
     MediaType,
+    StagedMedia,
 )
 
 
@@ -61,14 +64,17 @@ class TestDetectType:
 class TestBuildMediaReference:
     def test_build_media_reference_image(self, handler):
         ref = handler.build_media_reference(
-            [".media/123_photo.png"], MediaType.IMAGE
+            StagedMedia(originals=[".media/123_photo.png"]), MediaType.IMAGE
         )
         assert "Image file" in ref
         assert ".media/123_photo.png" in ref
 
     def test_build_media_reference_video(self, handler):
         ref = handler.build_media_reference(
-            [".media/123_clip.mp4", ".media/123_frame_001.png", ".media/123_frame_002.png"],
+            StagedMedia(
+                originals=[".media/123_clip.mp4"],
+                frames=[".media/123_frame_001.png", ".media/123_frame_002.png"],
+            ),
             MediaType.VIDEO,
         )
         assert ".media/123_clip.mp4" in ref
@@ -77,7 +83,10 @@ class TestBuildMediaReference:
 
     def test_build_media_reference_audio_with_transcript(self, handler):
         ref = handler.build_media_reference(
-            [".media/123_transcript.txt", ".media/123_voice.ogg"],
+            StagedMedia(
+                originals=[".media/123_voice.ogg"],
+                transcripts=[".media/123_transcript.txt"],
+            ),
             MediaType.AUDIO,
         )
         assert "transcript" in ref.lower()
@@ -87,20 +96,38 @@ class TestBuildMediaReference:
 
     def test_build_media_reference_audio_without_transcript(self, handler):
         ref = handler.build_media_reference(
-            [".media/123_voice.ogg"], MediaType.AUDIO
+            StagedMedia(originals=[".media/123_voice.ogg"]), MediaType.AUDIO
         )
         assert "audio file" in ref.lower()
         assert "transcript" not in ref.lower()
 
+    def test_build_media_reference_audio_transcript_in_filename(self, handler):
+        """An original whose name contains "transcript" is still the audio file."""
+        ref = handler.build_media_reference(
+            StagedMedia(originals=[".media/123_transcript_call.ogg"]), MediaType.AUDIO
+        )
+        assert ref == "Original audio file at: .media/123_transcript_call.ogg"
+
     def test_build_media_reference_document(self, handler):
         ref = handler.build_media_reference(
-            [".media/123_report.pdf"], MediaType.DOCUMENT
+            StagedMedia(originals=[".media/123_report.pdf"]), MediaType.DOCUMENT
         )
         assert "document" in ref.lower()
         assert ".media/123_report.pdf" in ref
 
     def test_build_media_reference_empty(self, handler):
-        assert handler.build_media_reference([], MediaType.IMAGE) == ""
+        assert handler.build_media_reference(StagedMedia(), MediaType.IMAGE) == ""
+
+
+class TestStagedMedia:
+    def test_paths_and_extend(self):
+        staged = StagedMedia(originals=[".media/1_a.mp4"], frames=[".media/1_frame_001.png"])
+        staged.extend(StagedMedia(originals=[".media/2_b.ogg"], transcripts=[".media/2_transcript.txt"]))
+        assert staged.paths == [
+            ".media/1_a.mp4", ".media/2_b.ogg", ".media/1_frame_001.png", ".media/2_transcript.txt",
+        ]
+        assert staged
+        assert not StagedMedia()
 
 
 class TestEnsureMediaDir:
@@ -125,19 +152,41 @@ class TestProcessAndStage:
         source.write_text("fake pdf content")
 
         with patch("agent_forge.media_handler.time") as mock_time:
-            mock_time.time.return_value = 1000000
-            paths, media_type = await handler.process_and_stage(
+            mock_time.time_ns.return_value = 1000000
+            staged, media_type = await handler.process_and_stage(
                 str(source), worktree, MediaType.DOCUMENT
             )
 
         assert media_type == MediaType.DOCUMENT
-        assert len(paths) == 1
-        assert paths[0] == ".media/1000000_report.pdf"
+        assert staged.paths == [".media/f4240_0_report.pdf"]
         # Verify file was actually copied
-        staged_file = Path(worktree) / ".media" / "1000000_report.pdf"
+        staged_file = Path(worktree) / ".media" / "f4240_0_report.pdf"
         assert staged_file.exists()
         assert staged_file.read_text() == "fake pdf content"
 
+    async def test_process_and_stage_same_tick_does_not_overwrite(
+        self, handler, worktree, tmp_path
+    ):
+        """Two files with the same name staged at the same instant both survive."""
+        first = tmp_path / "a" / "report.pdf"
+        second = tmp_path / "b" / "report.pdf"
+        for source, content in ((first, "first"), (second, "second")):
+            source.parent.mkdir()
+            source.write_text(content)
+
+        with patch("agent_forge.media_handler.time") as mock_time:
+            mock_time.time_ns.return_value = 1000000
+            staged1, _ = await handler.process_and_stage(
+                str(first), worktree, MediaType.DOCUMENT
+            )
+            staged2, _ = await handler.process_and_stage(
+                str(second), worktree, MediaType.DOCUMENT
+            )
+
+        assert staged1.paths != staged2.paths
+        assert (Path(worktree) / staged1.paths[0]).read_text() == "first"
+        assert (Path(worktree) / staged2.paths[0]).read_text() == "second"
+
     async def test_process_and_stage_image(self, handler, worktree, tmp_path):
         # Create a source image
         source = tmp_path / "photo.png"
@@ -150,17 +199,16 @@ class TestProcessAndStage:
                 handler, "_resize_image", return_value=str(source)
             ) as mock_resize,
         ):
-            mock_time.time.return_value = 1000000
-            paths, media_type = await handler.process_and_stage(
+            mock_time.time_ns.return_value = 1000000
+            staged, media_type = await handler.process_and_stage(
                 str(source), worktree, MediaType.IMAGE
             )
 
         mock_resize.assert_awaited_once_with(str(source))
         assert media_type == MediaType.IMAGE
-        assert len(paths) == 1
-        assert paths[0] == ".media/1000000_photo.png"
+        assert staged.paths == [".media/f4240_0_photo.png"]
         # Verify file was actually copied
-        staged_file = Path(worktree) / ".media" / "1000000_photo.png"
+        staged_file = Path(worktree) / ".media" / "f4240_0_photo.png"
         assert staged_file.exists()
 
     async def test_process_and_stage_video(self, handler, worktree, tmp_path):
@@ -168,7 +216,7 @@ class TestProcessAndStage:
         source = tmp_path / "clip.mp4"
         source.write_bytes(b"fake video data")
 
-        frame_dir = handler.temp_dir / "frames_1000000"
+        frame_dir = handler.temp_dir / "frames_f4240_0"
         frame_dir.mkdir(parents=True, exist_ok=True)
         frame1 = frame_dir / "frame_001.png"
         frame2 = frame_dir / "frame_002.png"
@@ -183,45 +231,46 @@ class TestProcessAndStage:
                 return_value=[str(frame1), str(frame2)],
             ),
         ):
-            mock_time.time.return_value = 1000000
-            paths, media_type = await handler.process_and_stage(
+            mock_time.time_ns.return_value = 1000000
+            staged, media_type = await handler.process_and_stage(
                 str(source), worktree, MediaType.VIDEO
             )
 
         assert media_type == MediaType.VIDEO
-        assert len(paths) == 3
-        assert ".media/1000000_clip.mp4" in paths
-        assert ".media/1000000_frame_001.png" in paths
-        assert ".media/1000000_frame_002.png" in paths
-        assert paths[0] == ".media/1000000_clip.mp4"  # video file listed first
+        assert staged.originals == [".media/f4240_0_clip.mp4"]
+        assert staged.frames == [".media/f4240_0_frame_001.png", ".media/f4240_0_frame_002.png"]
+        assert staged.paths[0] == ".media/f4240_0_clip.mp4"  # video file listed first
 
     async def test_process_and_stage_audio_with_transcript(
         self, handler, worktree, tmp_path
     ):
         source = tmp_path / "voice.ogg"
         source.write_bytes(b"fake audio data")
+        whisper_output = handler.temp_dir / "voice.txt"
+        whisper_output.write_text("Hello, this is a test.")
 
         with (
             patch("agent_forge.media_handler.time") as mock_time,
             patch.object(
                 handler,
                 "_transcribe_audio",
-                return_value="Hello, this is a test.",
+                return_value=whisper_output,
             ),
         ):
-            mock_time.time.return_value = 1000000
-            paths, media_type = await handler.process_and_stage(
+            mock_time.time_ns.return_value = 1000000
+            staged, media_type = await handler.process_and_stage(
                 str(source), worktree, MediaType.AUDIO
             )
 
         # Should have transcript + original audio
         assert media_type == MediaType.AUDIO
-        assert len(paths) == 2
-        assert ".media/1000000_transcript.txt" in paths
-        assert ".media/1000000_voice.ogg" in paths
+        assert staged.originals == [".media/f4240_0_voice.ogg"]
+        assert staged.transcripts == [".media/f4240_0_transcript.txt"]
         # Verify transcript content
-        transcript_file = Path(worktree) / ".media" / "1000000_transcript.txt"
+        transcript_file = Path(worktree) / ".media" / "f4240_0_transcript.txt"
         assert transcript_file.read_text() == "Hello, this is a test."
+        # Moved into the worktree, not copied
+        assert not whisper_output.exists()
 
     async def test_process_and_stage_audio_without_transcript(
         self, handler, worktree, tmp_path
@@ -233,15 +282,15 @@ class TestProcessAndStage:
             patch("agent_forge.media_handler.time") as mock_time,
             patch.object(handler, "_transcribe_audio", return_value=None),
         ):
-            mock_time.time.return_value = 1000000
-            paths, media_type = await handler.process_and_stage(
+            mock_time.time_ns.return_value = 1000000
+            staged, media_type = await handler.process_and_stage(
                 str(source), worktree, MediaType.AUDIO
             )
 
         # Should have only the original audio (no transcript)
         assert media_type == MediaType.AUDIO
-        assert len(paths) == 1
-        assert ".media/1000000_voice.ogg" in paths
+        assert staged.paths == [".media/f4240_0_voice.ogg"]
+        assert staged.transcripts == []
 
     async def test_process_and_stage_auto_detects_type(
         self, handler, worktree, tmp_path
@@ -256,14 +305,13 @@ class TestProcessAndStage:
                 handler, "_resize_image", return_value=str(source)
             ),
         ):
-            mock_time.time.return_value = 1000000
-            paths, media_type = await handler.process_and_stage(
+            mock_time.time_ns.return_value = 1000000
+            staged, media_type = await handler.process_and_stage(
                 str(source), worktree
             )
 
         assert media_type == MediaType.IMAGE
-        assert len(paths) == 1
-        assert ".media/1000000_screenshot.png" in paths
+        assert staged.paths == [".media/f4240_0_screenshot.png"]
 
 
 class TestExtractVideoFrames:
@@ -288,6 +336,39 @@ class TestExtractVideoFrames:
         assert len(frames) == 2
         assert "frame_001.png" in frames[0]
 
+    async def test_extract_video_frames_long_video_decodes_keyframes_only(
+        self, handler, tmp_path
+    ):
+        mock_proc = AsyncMock()
+        mock_proc.communicate = AsyncMock(return_value=(None, None))
+
+        with (
+            patch.object(handler, "_get_video_duration", return_value=600.0),
+            patch("asyncio.create_subprocess_exec", return_value=mock_proc) as mock_exec,
+        ):
+            await handler._extract_video_frames("/fake/video.mp4", str(tmp_path))
+
+        cmd = list(mock_exec.call_args.args)
+        # Decoder options must precede the input to take effect
+        assert cmd.index("-skip_frame") < cmd.index("-i")
+        assert cmd[cmd.index("-skip_frame") + 1] == "nokey"
+        assert cmd[cmd.index("-hwaccel") + 1] == "auto"
+        assert "-vf" not in cmd
+
+    async def test_extract_video_frames_discards_ffmpeg_output(self, handler, tmp_path):
+        mock_proc = AsyncMock()
+        mock_proc.communicate = AsyncMock(return_value=(None, None))
+
+        with (
+            patch.object(handler, "_get_video_duration", return_value=5.0),
+            patch("asyncio.create_subprocess_exec", return_value=mock_proc) as mock_exec,
+        ):
+            await handler._extract_video_frames("/fake/video.mp4", str(tmp_path))
+
+        kwargs = mock_exec.call_args.kwargs
+        assert kwargs["stdout"] == asyncio.subprocess.DEVNULL
+        assert kwargs["stderr"] == asyncio.subprocess.DEVNULL
+
     async def test_extract_video_frames_timeout(self, handler, tmp_path):
         output_dir = str(tmp_path / "frames")
         Path(output_dir).mkdir()
@@ -309,12 +390,15 @@ class TestExtractVideoFrames:
 class TestGetVideoDuration:
     async def test_get_video_duration_success(self, handler):
         mock_proc = AsyncMock()
-        mock_proc.communicate = AsyncMock(return_value=(b"12.5\n", b""))
+        mock_proc.communicate = AsyncMock(return_value=(b"12.5\n", None))
 
-        with patch("asyncio.create_subprocess_exec", return_value=mock_proc):
+        with patch("asyncio.create_subprocess_exec", return_value=mock_proc) as mock_exec:
             duration = await handler._get_video_duration("/fake/video.mp4")
 
         assert duration == 12.5
+        kwargs = mock_exec.call_args.kwargs
+        assert kwargs["stdout"] == asyncio.subprocess.PIPE
+        assert kwargs["stderr"] == asyncio.subprocess.DEVNULL
 
     async def test_get_video_duration_invalid_output(self, handler):
         mock_proc = AsyncMock()
@@ -326,7 +410,67 @@ class TestGetVideoDuration:
         assert duration is None
 
 
+class TestGetWhisperModel:
+    @pytest.fixture(autouse=True)
+    def _fresh_model_state(self, monkeypatch):
+        monkeypatch.setattr(media_handler, "_whisper_model", None)
+        monkeypatch.setattr(media_handler, "_whisper_unavailable", False)
+
+    def test_missing_package_is_not_retried(self):
+        with patch.dict(sys.modules, {"faster_whisper": None}):
+            assert media_handler._get_whisper_model() is None
+        assert media_handler._whisper_unavailable is True
+
+    def test_failed_load_is_retried(self):
+        fake = MagicMock()
+        fake.WhisperModel.side_effect = [OSError("download timed out"), MagicMock()]
+        with patch.dict(sys.modules, {"faster_whisper": fake}):
+            assert media_handler._get_whisper_model() is None
+            assert media_handler._get_whisper_model() is fake.BatchedInferencePipeline.return_value
+
+        assert fake.WhisperModel.call_count == 2
+
+
 class TestTranscribeAudio:
+    @pytest.fixture(autouse=True)
+    def _no_faster_whisper(self):
+        """Exercise the whisper CLI path unless a test supplies a model."""
+        with patch("agent_forge.media_handler._get_whisper_model", return_value=None):
+            yield
+
+    async def test_transcribe_audio_in_process(self, handler, tmp_path):
+        model = MagicMock()
+        model.transcribe.return_value = (
+            iter([MagicMock(text=" Hello,"), MagicMock(text=" world. ")]),
+            MagicMock(),
+        )
+
+        with (
+            patch("agent_forge.media_handler._get_whisper_model", return_value=model),
+            patch("asyncio.create_subprocess_exec") as mock_exec,
+        ):
+            result = await handler._transcribe_audio("/fake/audio.ogg", str(tmp_path))
+
+        assert result == tmp_path / "audio.txt"
+        assert result.read_text() == "Hello, world."
+        model.transcribe.assert_called_once_with(
+            "/fake/audio.ogg", vad_filter=True, chunk_length=30, batch_size=16,
+        )
+        mock_exec.assert_not_called()
+
+    async def test_transcribe_audio_in_process_failure_falls_back_to_cli(self, handler):
+        model = MagicMock()
+        model.transcribe.side_effect = RuntimeError("bad audio")
+
+        with (
+            patch("agent_forge.media_handler._get_whisper_model", return_value=model),
+            patch("shutil.which", return_value=None),
+        ):
+            result = await handler._transcribe_audio("/fake/audio.ogg", "/tmp")
+
+        assert result is None
+        model.transcribe.assert_called_once()
+
     async def test_transcribe_audio_no_whisper(self, handler):
         with patch("shutil.which", return_value=None):
             result = await handler._transcribe_audio("/fake/audio.ogg", "/tmp")
@@ -349,7 +493,39 @@ class TestTranscribeAudio:
                 "/fake/audio.ogg", str(tmp_path)
             )
 
-        assert result == "Transcribed text here"
+        assert result == txt_file
+
+    async def test_transcribe_audio_empty_output(self, handler, tmp_path):
+        (tmp_path / "audio.txt").write_text("")
+
+        mock_proc = AsyncMock()
+        mock_proc.communicate = AsyncMock(return_value=(None, None))
+
+        with (
+            patch("shutil.which", return_value="/usr/local/bin/whisper"),
+            patch("asyncio.create_subprocess_exec", return_value=mock_proc),
+        ):
+            result = await handler._transcribe_audio(
+                "/fake/audio.ogg", str(tmp_path)
+            )
+
+        assert result is None
+
+    async def test_transcribe_audio_whitespace_output(self, handler, tmp_path):
+        (tmp_path / "audio.txt").write_text("\n  \n")
+
+        mock_proc = AsyncMock()
+        mock_proc.communicate = AsyncMock(return_value=(b"", b""))
+
+        with (
+            patch("shutil.which", return_value="/usr/local/bin/whisper"),
+            patch("asyncio.create_subprocess_exec", return_value=mock_proc),
+        ):
+            result = await handler._transcribe_audio(
+                "/fake/audio.ogg", str(tmp_path)
+            )
+
+        assert result is None
 
     async def test_transcribe_audio_timeout(self, handler, tmp_path):
         mock_proc = AsyncMock()
@@ -1,24 +1,62 @@
 """Tests for MetricsCollector — system and per-agent metrics collection."""
 
+import json
 from unittest.mock import MagicMock, patch
 
-import psutil
 import pytest
 
 from agent_forge.agent_manager import Agent, AgentStatus
 from agent_forge.config import MetricsConfig
 from agent_forge.metrics_collector import (
+    CLK_TCK,
+    PAGE_SIZE,
     AgentMetrics,
     MetricsCollector,
     MetricsSnapshot,
     SystemMetrics,
+    _ProcessTable,
 )
 
 
+@pytest.fixture(autouse=True)
+def _no_procfs(tmp_path):
+    """Point procfs reads at an empty directory so tests never see real PIDs.
+
+    LINUX_PROCFS is forced on so the fake procfs trees below are read on any
+    platform.
+    """
+    with (
+        patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path / "no-proc")),
+        patch("agent_forge.metrics_collector.LINUX_PROCFS", True),
+    ):
+        yield
+
+
+def _write_proc_stat(
+    proc_root, pid, ppid, comm="bash", utime=0, stime=0, rss_pages=0, start_time=100,
+):
+    """Write a /proc/<pid>/stat line into a fake procfs tree."""
+    pid_dir = proc_root / str(pid)
+    pid_dir.mkdir(parents=True, exist_ok=True)
+    (pid_dir / "stat").write_text(
+        f"{pid} ({comm}) S {ppid} {pid} {pid} 0 -1 4194560 0 0 0 0 "
+        f"{utime} {stime} 0 0 20 0 1 0 {start_time} 1000000 {rss_pages} 18446744073709551615\n"
+    )
+
+
+def _psutil_proc(pid, ppid, cpu_percent=0.0, rss_mb=0):
+    """Build a process_iter() entry with pre-fetched info attrs."""
+    return MagicMock(pid=pid, info={
+        "ppid": ppid,
+        "cpu_percent": cpu_percent,
+        "memory_info": MagicMock(rss=rss_mb * 1024 * 1024),
+    })
+
+
 class TestCollectSystemMetrics:
     """Test system-wide metrics collection."""
 
-    @patch("agent_forge.metrics_collector.time.time")
+    @patch("agent_forge.metrics_collector.time.monotonic")
     @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.5, 1.2, 0.8))
     @patch("agent_forge.metrics_collector.psutil")
     def test_collect_system_metrics(self, mock_psutil, mock_loadavg, mock_time):
@@ -101,6 +139,93 @@ class TestCollectSystemMetrics:
         assert metrics.gpu_memory_total_mb is None
         assert metrics.gpu_temperature is None
 
+    @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.5, 1.2, 0.8))
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_collect_system_metrics_gpu(self, mock_psutil, mock_loadavg):
+        """GPU name and total memory are read once at init; live fields per call."""
+        mock_psutil.cpu_percent.return_value = 30.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=50.0, used=1, total=2)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=40.0, used=1, total=2)
+        mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+
+        pynvml = MagicMock()
+        pynvml.nvmlDeviceGetName.return_value = b"NVIDIA A100"
+        pynvml.nvmlDeviceGetMemoryInfo.return_value = MagicMock(
+            used=2 * 1024 * 1024 * 1024, total=40 * 1024 * 1024 * 1024,
+        )
+        pynvml.nvmlDeviceGetUtilizationRates.return_value = MagicMock(gpu=75)
+        pynvml.nvmlDeviceGetTemperature.return_value = 61
+
+        with patch("agent_forge.metrics_collector.pynvml", pynvml):
+            collector = MetricsCollector(enable_gpu=True)
+            collector.collect_system()
+            metrics = collector.collect_system()
+
+        assert metrics.gpu_name == "NVIDIA A100"
+        assert metrics.gpu_utilization == 75.0
+        assert metrics.gpu_memory_used_mb == pytest.approx(2 * 1024)
+        assert metrics.gpu_memory_total_mb == pytest.approx(40 * 1024)
+        assert metrics.gpu_temperature == 61.0
+        pynvml.nvmlDeviceGetName.assert_called_once()
+
+    @patch("agent_forge.metrics_collector.pynvml", None)
+    def test_gpu_disabled_without_pynvml(self):
+        collector = MetricsCollector(enable_gpu=True)
+        assert collector.gpu_available is False
+
+    @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.5, 1.2, 0.8))
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_gpu_sample_reused_within_poll_interval(self, mock_psutil, mock_loadavg):
+        mock_psutil.cpu_percent.return_value = 30.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=50.0, used=1, total=2)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=40.0, used=1, total=2)
+        mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+
+        pynvml = MagicMock()
+        pynvml.nvmlDeviceGetName.return_value = "GPU"
+        pynvml.nvmlDeviceGetMemoryInfo.return_value = MagicMock(used=0, total=1024 * 1024)
+        pynvml.nvmlDeviceGetUtilizationRates.return_value = MagicMock(gpu=10)
+        pynvml.nvmlDeviceGetTemperature.return_value = 50
+
+        with patch("agent_forge.metrics_collector.pynvml", pynvml):
+            collector = MetricsCollector(enable_gpu=True, gpu_poll_interval=5.0)
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=100.0):
+                collector.collect_system()
+            pynvml.nvmlDeviceGetUtilizationRates.return_value = MagicMock(gpu=90)
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=102.0):
+                cached = collector.collect_system()
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=105.0):
+                fresh = collector.collect_system()
+
+        assert cached.gpu_utilization == 10.0
+        assert fresh.gpu_utilization == 90.0
+        assert pynvml.nvmlDeviceGetUtilizationRates.call_count == 2
+
+    @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.5, 1.2, 0.8))
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_disk_and_loadavg_cached_within_ttl(self, mock_psutil, mock_loadavg):
+        mock_psutil.cpu_percent.return_value = 30.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=50.0, used=1, total=2)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=40.0, used=1, total=2)
+        mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+
+        collector = MetricsCollector(enable_gpu=False)
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=10.0):
+            collector.collect_system()
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=10.5):
+            metrics = collector.collect_system()
+
+        assert metrics.disk_percent == 40.0
+        assert metrics.load_avg_1min == 1.5
+        assert mock_psutil.disk_usage.call_count == 1
+        assert mock_loadavg.call_count == 1
+
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=11.5):
+            collector.collect_system()
+
+        assert mock_psutil.disk_usage.call_count == 2
+        assert mock_loadavg.call_count == 2
+
 
 class TestCollectAgentMetrics:
     """Test per-agent metrics collection."""
@@ -121,41 +246,15 @@ class TestCollectAgentMetrics:
         # tmux list-panes returns pane PID
         mock_subprocess.return_value = MagicMock(returncode=0, stdout="1234\n")
 
-        # Root process and its children
-        mock_child1 = MagicMock(pid=1235)
-        mock_child2 = MagicMock(pid=1236)
-        mock_root = MagicMock()
-        mock_root.children.return_value = [mock_child1, mock_child2]
-
-        def make_proc(pid):
-            if pid == 1234:
-                p = MagicMock()
-                p.children.return_value = [mock_child1, mock_child2]
-                p.cpu_percent.return_value = 10.0
-                p.memory_info.return_value = MagicMock(rss=100 * 1024 * 1024)
-                p.status.return_value = "running"
-                return p
-            elif pid == 1235:
-                p = MagicMock()
-                p.cpu_percent.return_value = 5.0
-                p.memory_info.return_value = MagicMock(rss=50 * 1024 * 1024)
-                p.status.return_value = "running"
-                return p
-            elif pid == 1236:
-                p = MagicMock()
-                p.cpu_percent.return_value = 3.0
-                p.memory_info.return_value = MagicMock(rss=30 * 1024 * 1024)
-                p.status.return_value = "running"
-                return p
-
-        mock_psutil.Process.side_effect = make_proc
-        mock_psutil.NoSuchProcess = psutil.NoSuchProcess
-        mock_psutil.AccessDenied = psutil.AccessDenied
+        # Root process, its children, and an unrelated process
+        mock_psutil.process_iter.return_value = [
+            _psutil_proc(1, 0, cpu_percent=50.0, rss_mb=500),
+            _psutil_proc(1234, 1, cpu_percent=10.0, rss_mb=100),
+            _psutil_proc(1235, 1234, cpu_percent=5.0, rss_mb=50),
+            _psutil_proc(1236, 1235, cpu_percent=3.0, rss_mb=30),
+        ]
 
         collector = MetricsCollector(enable_gpu=False)
-        # First call warms up the cache (cpu_percent returns 0 on first call)
-        collector.collect_agent(agent)
-        # Second call gets real values
         metrics = collector.collect_agent(agent)
 
         assert metrics is not None
@@ -179,8 +278,6 @@ class TestCollectAgentMetrics:
 
         # tmux list-panes fails (session doesn't exist)
         mock_subprocess.return_value = MagicMock(returncode=1, stdout="")
-        mock_psutil.NoSuchProcess = psutil.NoSuchProcess
-        mock_psutil.AccessDenied = psutil.AccessDenied
 
         collector = MetricsCollector(enable_gpu=False)
         metrics = collector.collect_agent(agent)
@@ -194,7 +291,7 @@ class TestCollectAgentMetrics:
     @patch("agent_forge.metrics_collector.psutil")
     @patch("agent_forge.metrics_collector.subprocess.run")
     def test_collect_agent_metrics_access_denied(self, mock_subprocess, mock_psutil):
-        """psutil.AccessDenied handled gracefully."""
+        """Processes whose memory_info is denied still count, with zero RSS."""
         agent = Agent(
             id="def456",
             project_name="test-project",
@@ -206,10 +303,33 @@ class TestCollectAgentMetrics:
 
         # tmux returns a PID
         mock_subprocess.return_value = MagicMock(returncode=0, stdout="1234\n")
-        # But psutil.Process raises AccessDenied
-        mock_psutil.Process.side_effect = psutil.AccessDenied("test")
-        mock_psutil.NoSuchProcess = psutil.NoSuchProcess
-        mock_psutil.AccessDenied = psutil.AccessDenied
+        # process_iter reports denied attrs as None
+        mock_psutil.process_iter.return_value = [
+            MagicMock(pid=1234, info={"ppid": 1, "cpu_percent": None, "memory_info": None}),
+        ]
+
+        collector = MetricsCollector(enable_gpu=False)
+        metrics = collector.collect_agent(agent)
+
+        assert metrics is not None
+        assert metrics.process_count == 1
+        assert metrics.cpu_percent == 0.0
+        assert metrics.memory_mb == 0.0
+
+    @patch("agent_forge.metrics_collector.psutil")
+    @patch("agent_forge.metrics_collector.subprocess.run")
+    def test_collect_agent_metrics_process_gone(self, mock_subprocess, mock_psutil):
+        """A pane PID missing from the process table yields zero counts."""
+        agent = Agent(
+            id="def456",
+            project_name="test-project",
+            session_name="forge__test-project__def456",
+            worktree_path="/tmp/worktree",
+            branch_name="agent/def456/task",
+            status=AgentStatus.WORKING,
+        )
+        mock_subprocess.return_value = MagicMock(returncode=0, stdout="1234\n")
+        mock_psutil.process_iter.return_value = []
 
         collector = MetricsCollector(enable_gpu=False)
         metrics = collector.collect_agent(agent)
@@ -243,25 +363,17 @@ class TestCollectAll:
             bytes_recv=2000 * 1024 * 1024,
         )
 
-        # Mock tmux list-panes: agent1 has a session, agent2 is stopped (won't be queried)
-        def subprocess_side_effect(*args, **kwargs):
-            cmd = args[0] if args else kwargs.get("args", [])
-            if "forge__project__agent1" in cmd:
-                return MagicMock(returncode=0, stdout="1234\n")
-            return MagicMock(returncode=1, stdout="")
-
-        mock_subprocess.side_effect = subprocess_side_effect
-
-        # Mock process tree for agent1's pane PID
-        mock_process_instance = MagicMock()
-        mock_process_instance.children.return_value = []
-        mock_process_instance.cpu_percent.return_value = 8.0
-        mock_process_instance.memory_info.return_value = MagicMock(rss=80 * 1024 * 1024)
-        mock_process_instance.status.return_value = "running"
+        # Mock tmux list-panes -a: agent1 has a session, agent2 is stopped (won't be queried)
+        mock_subprocess.return_value = MagicMock(
+            returncode=0,
+            stdout="forge__project__agent1 1234\nforge__other__zzz999 4321\n",
+        )
 
-        mock_psutil.Process.return_value = mock_process_instance
-        mock_psutil.NoSuchProcess = psutil.NoSuchProcess
-        mock_psutil.AccessDenied = psutil.AccessDenied
+        # Process table: agent1's pane PID and an unrelated session's
+        mock_psutil.process_iter.return_value = [
+            _psutil_proc(1234, 1, cpu_percent=8.0, rss_mb=80),
+            _psutil_proc(4321, 1, cpu_percent=1.0, rss_mb=10),
+        ]
 
         # Create mock agent manager
         agent1 = Agent(
@@ -285,10 +397,6 @@ class TestCollectAll:
         mock_manager.list_agents.return_value = [agent1, agent2]
 
         collector = MetricsCollector(enable_gpu=False)
-        # First call warms up the cache
-        with patch("agent_forge.metrics_collector.time.time", return_value=1234567889.0):
-            collector.collect_all(mock_manager)
-        # Second call gets real values
         with patch("agent_forge.metrics_collector.time.time", return_value=1234567890.0):
             snapshot = collector.collect_all(mock_manager)
 
@@ -301,7 +409,185 @@ class TestCollectAll:
         assert "agent1" in snapshot.agents
         assert "agent2" not in snapshot.agents
         assert snapshot.total_agents_running == 1
+        assert snapshot.agents["agent1"].cpu_percent == 8.0
         assert snapshot.total_agent_memory_mb == pytest.approx(80, rel=0.01)
+        # A single batched tmux call and process-table pass per collection cycle
+        assert mock_subprocess.call_count == 1
+        assert mock_psutil.process_iter.call_count == 1
+        assert mock_subprocess.call_args[0][0][:3] == ["tmux", "list-panes", "-a"]
+
+    @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.0, 0.9, 0.8))
+    @patch("agent_forge.metrics_collector.psutil")
+    @patch("agent_forge.metrics_collector.subprocess.run")
+    def test_collect_all_multiple_agents(self, mock_subprocess, mock_psutil, mock_loadavg):
+        """Several running agents share one tmux call and one process scan."""
+        mock_psutil.cpu_percent.return_value = 10.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=10.0, used=1, total=2)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=10.0, used=1, total=2)
+        mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+        mock_psutil.process_iter.return_value = []
+        mock_subprocess.return_value = MagicMock(returncode=1, stdout="")
+
+        agents = [
+            Agent(
+                id=f"agent{i}",
+                project_name="project",
+                session_name=f"forge__project__agent{i}",
+                worktree_path="/tmp/worktree",
+                branch_name=f"agent/agent{i}/task",
+                status=AgentStatus.WORKING,
+            )
+            for i in range(4)
+        ]
+        mock_manager = MagicMock()
+        mock_manager.list_agents.return_value = agents
+
+        collector = MetricsCollector(enable_gpu=False)
+        snapshot = collector.collect_all(mock_manager)
+
+        assert set(snapshot.agents) == {"agent0", "agent1", "agent2", "agent3"}
+        assert snapshot.total_agents_running == 4
+        assert mock_subprocess.call_count == 1
+        assert mock_psutil.process_iter.call_count == 1
+
+
+class TestGetAllPanePids:
+    """Test batched pane PID lookup."""
+
+    @patch("agent_forge.metrics_collector.subprocess.run")
+    def test_parses_sessions(self, mock_subprocess):
+        mock_subprocess.return_value = MagicMock(
+            returncode=0,
+            stdout="forge__a__111111 100\nforge__a__111111 101\nforge__b__222222 200\n",
+        )
+        assert MetricsCollector._get_all_pane_pids() == {
+            "forge__a__111111": 100,
+            "forge__b__222222": 200,
+        }
+
+    @patch("agent_forge.metrics_collector.subprocess.run")
+    def test_no_server(self, mock_subprocess):
+        mock_subprocess.return_value = MagicMock(returncode=1, stdout="")
+        assert MetricsCollector._get_all_pane_pids() == {}
+
+    @patch("agent_forge.metrics_collector.subprocess.run", side_effect=FileNotFoundError)
+    def test_tmux_missing(self, mock_subprocess):
+        assert MetricsCollector._get_all_pane_pids() == {}
+
+
+class TestSnapshotProcesses:
+    """Test the single-pass process table snapshot."""
+
+    def test_reads_procfs(self, tmp_path):
+        _write_proc_stat(tmp_path, 1, 0, comm="init")
+        _write_proc_stat(tmp_path, 100, 1, rss_pages=10)
+        _write_proc_stat(tmp_path, 101, 100, comm="tmux: server (x)", rss_pages=20)
+        _write_proc_stat(tmp_path, 102, 100, comm="node")
+        (tmp_path / "self").mkdir()
+        (tmp_path / "103").mkdir()  # exited between listdir and open
+
+        collector = MetricsCollector(enable_gpu=False)
+        with patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path)):
+            table = collector._snapshot_processes()
+
+        assert table.children[0] == [1]
+        assert table.children[1] == [100]
+        assert sorted(table.children[100]) == [101, 102]
+        assert table.samples[101] == (0.0, 20 * PAGE_SIZE)
+        assert 103 not in table.samples
+
+    def test_cpu_percent_from_tick_delta(self, tmp_path):
+        _write_proc_stat(tmp_path, 100, 1, utime=100, stime=50)
+        collector = MetricsCollector(enable_gpu=False)
+        with patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path)):
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=10.0):
+                collector._snapshot_processes()
+            # One CPU-second of ticks over two seconds of wall time
+            _write_proc_stat(tmp_path, 100, 1, utime=100 + CLK_TCK // 2, stime=50 + CLK_TCK // 2)
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=12.0):
+                table = collector._snapshot_processes()
+
+        assert table.samples[100][0] == pytest.approx(50.0)
+
+    def test_reused_pid_starts_fresh(self, tmp_path):
+        """A new process that reuses a PID is not charged the old process's ticks."""
+        _write_proc_stat(tmp_path, 100, 1, utime=5000, start_time=100)
+        collector = MetricsCollector(enable_gpu=False)
+        with patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path)):
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=10.0):
+                collector._snapshot_processes()
+            _write_proc_stat(tmp_path, 100, 1, utime=10, start_time=900)
+            with patch("agent_forge.metrics_collector.time.monotonic", return_value=12.0):
+                table = collector._snapshot_processes()
+
+        assert table.samples[100][0] == 0.0
+
+    def test_exited_pids_are_forgotten(self, tmp_path):
+        _write_proc_stat(tmp_path, 100, 1)
+        _write_proc_stat(tmp_path, 101, 1)
+        collector = MetricsCollector(enable_gpu=False)
+        with patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path)):
+            collector._snapshot_processes()
+            (tmp_path / "101" / "stat").unlink()
+            (tmp_path / "101").rmdir()
+            collector._snapshot_processes()
+
+        assert set(collector._last_ticks) == {100}
+
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_falls_back_to_psutil(self, mock_psutil, tmp_path):
+        mock_psutil.process_iter.return_value = [
+            _psutil_proc(10, 1, cpu_percent=2.0, rss_mb=1),
+            _psutil_proc(11, 10),
+            _psutil_proc(12, 10),
+        ]
+
+        collector = MetricsCollector(enable_gpu=False)
+        with patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path / "missing")):
+            table = collector._snapshot_processes()
+
+        assert table.children == {1: [10], 10: [11, 12]}
+        assert table.samples[10] == (2.0, 1024 * 1024)
+        mock_psutil.process_iter.assert_called_once_with(["ppid", "cpu_percent", "memory_info"])
+
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_non_linux_uses_psutil_even_with_proc(self, mock_psutil, tmp_path):
+        _write_proc_stat(tmp_path, 100, 1)
+        mock_psutil.process_iter.return_value = [_psutil_proc(10, 1)]
+
+        collector = MetricsCollector(enable_gpu=False)
+        with (
+            patch("agent_forge.metrics_collector.PROC_ROOT", str(tmp_path)),
+            patch("agent_forge.metrics_collector.LINUX_PROCFS", False),
+        ):
+            table = collector._snapshot_processes()
+
+        assert set(table.samples) == {10}
+
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_collect_agent_walks_shared_table(self, mock_psutil):
+        """collect_agent sums the pane's subtree without touching psutil."""
+        agent = Agent(
+            id="abc123",
+            project_name="test-project",
+            session_name="forge__test-project__abc123",
+            worktree_path="/tmp/worktree",
+            branch_name="agent/abc123/task",
+            status=AgentStatus.WORKING,
+        )
+        mb = 1024 * 1024
+        table = _ProcessTable(
+            samples={100: (1.0, mb), 101: (2.0, 2 * mb), 102: (3.0, 3 * mb), 500: (9.0, 9 * mb)},
+            children={1: [100, 500], 100: [101], 101: [102]},
+        )
+        collector = MetricsCollector(enable_gpu=False)
+        metrics = collector.collect_agent(agent, {"forge__test-project__abc123": 100}, table)
+
+        assert metrics.process_count == 3  # 100 -> 101 -> 102; 500 is not in the subtree
+        assert metrics.cpu_percent == pytest.approx(6.0)
+        assert metrics.memory_mb == pytest.approx(6.0)
+        mock_psutil.Process.assert_not_called()
+        mock_psutil.process_iter.assert_not_called()
 
 
 class TestNetworkThroughputDelta:
@@ -328,7 +614,7 @@ class TestNetworkThroughputDelta:
         collector = MetricsCollector(enable_gpu=False)
 
         # First collect (should have baseline but no delta yet)
-        with patch("agent_forge.metrics_collector.time.time", return_value=100.0):
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=100.0):
             metrics1 = collector.collect_system()
 
         # Network should be 0 or close to 0 on first call
@@ -341,7 +627,7 @@ class TestNetworkThroughputDelta:
             bytes_recv=2100 * 1024 * 1024,  # +100 MB
         )
 
-        with patch("agent_forge.metrics_collector.time.time", return_value=110.0):
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=110.0):
             metrics2 = collector.collect_system()
 
         # 50 MB / 10 seconds = 5 MB/s
@@ -349,6 +635,85 @@ class TestNetworkThroughputDelta:
         # 100 MB / 10 seconds = 10 MB/s
         assert metrics2.network_recv_mbps == pytest.approx(10.0, rel=0.01)
 
+    @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.0, 1.0, 1.0))
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_network_rate_ignores_wall_clock_jumps(self, mock_psutil, mock_loadavg):
+        """A wall-clock step (e.g. NTP) must not distort the rate."""
+        mock_psutil.cpu_percent.return_value = 0.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=0.0, used=0, total=1)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=0.0, used=0, total=1)
+        mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=50.0):
+            collector = MetricsCollector(enable_gpu=False)
+
+        mock_psutil.net_io_counters.return_value = MagicMock(
+            bytes_sent=20 * 1024 * 1024, bytes_recv=0,
+        )
+        with patch("agent_forge.metrics_collector.time.monotonic", return_value=60.0), \
+                patch("agent_forge.metrics_collector.time.time", return_value=0.0):
+            metrics = collector.collect_system()
+
+        assert metrics.network_sent_mbps == pytest.approx(2.0, rel=0.01)
+        assert metrics.network_recv_mbps == 0.0
+
+
+class TestSnapshotSerialization:
+    """Test JSON serialization of the metrics dataclasses."""
+
+    def _snapshot(self):
+        system = SystemMetrics(
+            cpu_percent=12.5, memory_percent=50.0, memory_used_mb=1024.0,
+            memory_total_mb=2048.0, disk_percent=40.0, disk_used_gb=10.0,
+            disk_total_gb=25.0, load_avg_1min=1.0, load_avg_5min=0.5,
+            load_avg_15min=0.25, network_sent_mbps=0.0, network_recv_mbps=0.0,
+        )
+        return MetricsSnapshot(
+            timestamp=100.0,
+            system=system,
+            agents={"abc123": AgentMetrics(
+                agent_id="abc123", process_count=3, cpu_percent=5.0, memory_mb=80.0,
+            )},
+            total_agents_running=1,
+            total_agent_memory_mb=80.0,
+        )
+
+    def test_to_dict(self):
+        data = self._snapshot().to_dict()
+        assert data["system"]["cpu_percent"] == 12.5
+        assert data["system"]["gpu_name"] is None
+        assert data["agents"]["abc123"] == {
+            "agent_id": "abc123", "process_count": 3, "cpu_percent": 5.0, "memory_mb": 80.0,
+        }
+        assert data["total_agents_running"] == 1
+
+    def test_to_json_matches_to_dict(self):
+        snapshot = self._snapshot()
+        assert json.loads(snapshot.to_json()) == snapshot.to_dict()
+
+
+class TestMetricsHistory:
+    """Test the bounded snapshot history kept by collect_all."""
+
+    @patch("agent_forge.metrics_collector.os.getloadavg", return_value=(1.0, 1.0, 1.0))
+    @patch("agent_forge.metrics_collector.psutil")
+    def test_history_is_bounded(self, mock_psutil, mock_loadavg):
+        mock_psutil.cpu_percent.return_value = 0.0
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=0.0, used=0, total=1)
+        mock_psutil.disk_usage.return_value = MagicMock(percent=0.0, used=0, total=1)
+        mock_psutil.net_io_counters.return_value = MagicMock(bytes_sent=0, bytes_recv=0)
+        mock_manager = MagicMock()
+        mock_manager.list_agents.return_value = []
+
+        collector = MetricsCollector(enable_gpu=False, history_size=2)
+        snapshots = [collector.collect_all(mock_manager) for _ in range(3)]
+
+        assert list(collector.history) == snapshots[1:]
+        data = json.loads(collector.history_json())
+        assert [s["timestamp"] for s in data] == [s.timestamp for s in snapshots[1:]]
+        assert len(json.loads(collector.history_json(limit=1))) == 1
+        assert json.loads(collector.history_json(limit=0)) == []
+
 
 class TestMetricsConfigDefaults:
     """Test MetricsConfig Pydantic defaults."""
@@ -359,4 +724,6 @@ class TestMetricsConfigDefaults:
         assert config.enabled is True
         assert config.collect_interval_seconds == 5.0
         assert config.enable_gpu is True
+        assert config.gpu_poll_interval_seconds == 5.0
+        assert config.history_size == 128
         assert config.enable_per_agent is True
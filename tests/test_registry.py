@@ -54,6 +54,26 @@ class TestProjectRegistry:
         with pytest.raises(FileNotFoundError):
             ProjectRegistry(config_path="/nonexistent/config.yaml")
 
+    def test_validate_warns_on_missing_path_and_non_git_dir(self, tmp_path, caplog):
+        plain_dir = tmp_path / "plain"
+        plain_dir.mkdir()
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.dump({"projects": {
+            "gone": {"path": str(tmp_path / "missing")},
+            "plain": {"path": str(plain_dir)},
+        }}))
+
+        with caplog.at_level("WARNING", logger="agent_forge.registry"):
+            ProjectRegistry(config_path=str(config_path))
+
+        assert "Project 'gone': path does not exist" in caplog.text
+        assert "Project 'plain': not a git repo" in caplog.text
+
+    def test_validate_quiet_for_git_repo(self, config_file, caplog):
+        with caplog.at_level("WARNING", logger="agent_forge.registry"):
+            ProjectRegistry(config_path=str(config_file))
+        assert "Project 'test-project'" not in caplog.text
+
     def test_reload(self, config_file, registry):
         # Initial state
         assert "test-project" in registry.list_projects()
@@ -120,3 +140,9 @@ class TestProjectRegistry:
 
         # Original project should still be there
         assert "test-project" in fresh.list_projects()
+
+    def test_save_keeps_in_memory_config(self, registry):
+        """save() does not swap self.config for a freshly parsed copy."""
+        cfg = registry.config
+        registry.save()
+        assert registry.config is cfg
@@ -1,15 +1,18 @@
 """Tests for the LLM-based response extractor."""
 
+import json
 from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
 
+from agent_forge import response_extractor
 from agent_forge.response_extractor import (
     ExtractionResult,
     extract_response,
     extract_response_regex,
     preprocess_output,
+    strip_ansi,
 )
 
 
@@ -47,6 +50,12 @@ class TestPreprocessOutput:
         result = preprocess_output(raw)
         assert len(result) <= 10500  # Allow slight overhead
 
+    def test_limits_non_ascii_by_bytes(self):
+        lines = [f"行 {i}: " + "漢字" * 45 for i in range(200)]
+        result = preprocess_output("\n".join(lines))
+        assert len(result.encode("utf-8")) <= 16 * 1024
+        assert result.endswith(lines[-1])
+
     def test_empty_input(self):
         assert preprocess_output("") == ""
 
@@ -151,6 +160,40 @@ class TestPreprocessOutput:
         assert "a33d24a" not in result
         assert "1e127f9" not in result
 
+    def test_filters_channelling_status(self):
+        raw = "Real output\nesc to interrupt · Channelling… (12s)\nChannellings are fine"
+        result = preprocess_output(raw)
+        assert "Channelling…" not in result
+        assert "Real output" in result
+        assert "Channellings are fine" in result
+
+    def test_only_scans_tail_of_huge_capture(self):
+        """Content further back than the scan window is never reached."""
+        raw = "Ancient meaningful line\n" + "> \n" * 200_000 + "Final answer line"
+        assert preprocess_output(raw) == "Final answer line"
+
+    def test_collapses_consecutive_redraws(self):
+        """Consecutive duplicates keep the first copy; separated repeats stay."""
+        raw = "Building step\n  Building step  \nBuilding step\nOther line\nBuilding step"
+        assert preprocess_output(raw) == "Building step\nOther line\nBuilding step"
+
+    def test_keeps_most_recent_lines_within_budget(self):
+        lines = [f"line {i}: " + "x" * 90 for i in range(200)]
+        result = preprocess_output("\n".join(lines)).splitlines()
+        assert result[-1] == lines[-1]
+        assert result == lines[-len(result):]
+
+
+class TestStripAnsi:
+    def test_returns_clean_input_unchanged(self):
+        text = "no escapes here\nsecond line"
+        assert strip_ansi(text) is text
+
+    def test_keeps_prefix_before_first_escape(self):
+        assert strip_ansi("plain \x1b[1mbold\x1b[0m tail") == "plain bold tail"
+
+    def test_osc_spanning_lines(self):
+        assert strip_ansi("a\x1b]0;title\nmore\x07b") == "ab"
 
 class TestExtractResponseRegex:
     def test_returns_last_50_meaningful_lines(self):
@@ -247,6 +290,12 @@ class TestExtractResponseRegex:
 
 
 class TestExtractResponse:
+    @pytest.fixture(autouse=True)
+    def _fresh_client(self, monkeypatch):
+        """Each test starts without a cached shared client or results."""
+        monkeypatch.setattr(response_extractor, "_client", None)
+        monkeypatch.setattr(response_extractor, "_result_cache", response_extractor.OrderedDict())
+
     @pytest.mark.asyncio
     async def test_successful_extraction(self):
         mock_response = httpx.Response(
@@ -344,3 +393,144 @@ class TestExtractResponse:
         body = call_kwargs[1]["json"]
         assert body["model"] == "claude-sonnet-4-5-20250929"
         assert body["max_tokens"] == 100
+
+    @pytest.mark.asyncio
+    async def test_reuses_shared_client(self):
+        mock_response = httpx.Response(
+            200,
+            json={"content": [{"type": "text", "text": "Response"}]},
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        )
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.is_closed = False
+            mock_client.post.return_value = mock_response
+            mock_client_cls.return_value = mock_client
+
+            await extract_response("Some output", api_key="test-key", timeout=3.0)
+            await extract_response("Other output", api_key="test-key", timeout=3.0)
+
+        assert mock_client_cls.call_count == 1
+        assert mock_client.post.call_count == 2
+        assert mock_client.post.call_args[1]["timeout"] == 3.0
+
+    @pytest.mark.asyncio
+    async def test_retries_overloaded_status(self):
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        overloaded = httpx.Response(429, headers={"retry-after": "2"}, request=request)
+        ok = httpx.Response(
+            200, json={"content": [{"type": "text", "text": "Done"}]}, request=request,
+        )
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls, \
+                patch("agent_forge.response_extractor.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            mock_client = AsyncMock()
+            mock_client.post.side_effect = [overloaded, ok]
+            mock_client_cls.return_value = mock_client
+
+            result = await extract_response("Some output", api_key="test-key")
+
+        assert result.text == "Done"
+        assert mock_client.post.call_count == 2
+        mock_sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls, \
+                patch("agent_forge.response_extractor.asyncio.sleep", new=AsyncMock()):
+            mock_client = AsyncMock()
+            mock_client.post.side_effect = [
+                httpx.ConnectError("refused", request=request),
+                httpx.Response(503, request=request),
+                httpx.Response(503, request=request),
+            ]
+            mock_client_cls.return_value = mock_client
+
+            result = await extract_response("Some output", api_key="test-key")
+
+        assert result is None
+        assert mock_client.post.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_stop_at_timeout(self):
+        """A Retry-After past the caller's timeout is not waited out."""
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        overloaded = httpx.Response(429, headers={"retry-after": "10"}, request=request)
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls, \
+                patch("agent_forge.response_extractor.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = overloaded
+            mock_client_cls.return_value = mock_client
+
+            result = await extract_response("Some output", api_key="test-key", timeout=5.0)
+
+        assert result is None
+        assert mock_client.post.call_count == 1
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_single_block_skips_api(self):
+        raw = "> what is 2+2?\n⏺ It is 4, as computed by simple arithmetic.\n> "
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls:
+            result = await extract_response(raw, api_key="test-key")
+
+        assert result.text == "It is 4, as computed by simple arithmetic."
+        mock_client_cls.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_single_block_naming_a_file_uses_api(self):
+        """The model still picks out files the answer refers to."""
+        raw = "> where is the screenshot?\n⏺ The screenshot is saved to ./out/a.png from before.\n> "
+        model_text = json.dumps({"text": "Saved to ./out/a.png", "files": ["/work/out/a.png"]})
+        mock_response = httpx.Response(
+            200,
+            json={"content": [{"type": "text", "text": model_text}]},
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        )
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client_cls.return_value = mock_client
+
+            result = await extract_response(raw, api_key="test-key")
+
+        mock_client.post.assert_called_once()
+        assert result.file_paths == ["/work/out/a.png"]
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_or_force_llm_use_api(self):
+        mock_response = httpx.Response(
+            200,
+            json={"content": [{"type": "text", "text": "From model"}]},
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        )
+        with_tool = "⏺ Bash(ls)\n  ⎿  a.txt\n⏺ There is one file, a.txt, in the folder."
+        single = "⏺ It is 4, as computed by simple arithmetic."
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client_cls.return_value = mock_client
+
+            assert (await extract_response(with_tool, api_key="k")).text == "From model"
+            assert (await extract_response(single, api_key="k", force_llm=True)).text == "From model"
+
+        assert mock_client.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_identical_capture_uses_cached_result(self):
+        mock_response = httpx.Response(
+            200,
+            json={"content": [{"type": "text", "text": "Cached answer"}]},
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        )
+        with patch("agent_forge.response_extractor.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client_cls.return_value = mock_client
+
+            first = await extract_response("Some output", api_key="test-key")
+            second = await extract_response("Some output", api_key="test-key")
+            await extract_response("Some output", api_key="test-key", model="other-model")
+
+        assert first.text == second.text == "Cached answer"
+        assert mock_client.post.call_count == 2
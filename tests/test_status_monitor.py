@@ -12,6 +12,13 @@ from agent_forge.response_extractor import ExtractionResult
 from agent_forge.status_monitor import StatusMonitor
 
 
+@pytest.fixture(autouse=True)
+def _no_pane_activity():
+    """Report tmux activity as unknown, so every poll captures each pane."""
+    with patch("agent_forge.tmux_utils.list_pane_activity", return_value=None):
+        yield
+
+
 class TestDetectStatus:
     """Test detect_status with various terminal outputs."""
 
@@ -59,6 +66,20 @@ class TestDetectStatus:
         output = "user@host:~$ "
         assert StatusMonitor.detect_status(output, "") == AgentStatus.IDLE
 
+    def test_mixed_case_prompt_and_error(self):
+        assert StatusMonitor.detect_status("DO YOU WANT to continue?", "") == AgentStatus.WAITING_INPUT
+        assert StatusMonitor.detect_status("FATAL: disk full", "") == AgentStatus.ERROR
+        # FAILED is matched case-sensitively only
+        assert StatusMonitor.detect_status("2 tests failed", "") == AgentStatus.WORKING
+
+    def test_idle_prompt_on_last_line_before_blank_lines(self):
+        output = "building...\ndone\nclaude >\n\n   \n"
+        assert StatusMonitor.detect_status(output, "") == AgentStatus.IDLE
+
+    def test_prompt_char_on_earlier_line_is_not_idle(self):
+        output = "claude >\nstill working"
+        assert StatusMonitor.detect_status(output, "") == AgentStatus.WORKING
+
     def test_output_changed_means_working(self):
         previous = "line 1\nline 2"
         current = "line 1\nline 2\nline 3"
@@ -161,6 +182,168 @@ class TestStatusMonitorPoll:
         mock_capture.assert_not_called()
         mock_exists.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_poll_reuses_capture_without_pane_activity(self, monitor, agent):
+        """A pane tmux saw no output from since the last capture is not re-captured."""
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value="working...") as mock_capture,
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+            patch("agent_forge.status_monitor.time.time", return_value=1000.5),
+        ):
+            await monitor._poll()
+            with patch(
+                "agent_forge.tmux_utils.list_pane_activity",
+                return_value={agent.session_name: 999},
+            ):
+                await monitor._poll()
+            assert mock_capture.call_count == 1
+
+            with patch(
+                "agent_forge.tmux_utils.list_pane_activity",
+                return_value={agent.session_name: 1000},
+            ):
+                await monitor._poll()
+            assert mock_capture.call_count == 2
+
+        assert agent.last_output == "working..."
+
+    @pytest.mark.asyncio
+    async def test_poll_uses_pane_listing_for_existence(self, monitor, agent):
+        """With a pane listing, no per-agent has-session call is made."""
+        with (
+            patch("agent_forge.tmux_utils.capture_pane") as mock_capture,
+            patch("agent_forge.tmux_utils.session_exists") as mock_exists,
+            patch("agent_forge.tmux_utils.list_pane_activity", return_value={"other": 1}),
+        ):
+            await monitor._poll()
+
+        assert agent.status == AgentStatus.STOPPED
+        mock_capture.assert_not_called()
+        mock_exists.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_poll_recaptures_idle_pane_periodically(self, monitor, agent):
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value="idle") as mock_capture,
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+            patch(
+                "agent_forge.tmux_utils.list_pane_activity",
+                return_value={agent.session_name: 0},
+            ),
+        ):
+            for _ in range(12):
+                await monitor._poll()
+
+        # first poll, then once after _MAX_SKIPPED_CAPTURES (10) skips
+        assert mock_capture.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_poll_skips_publishing_unchanged_agent(self, monitor, agent):
+        """An agent whose state did not change is not re-broadcast."""
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value="claude >"),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            await monitor._poll()
+            with patch.object(StatusMonitor, "detect_status") as mock_detect:
+                await monitor._poll()
+            mock_detect.assert_not_called()
+            assert monitor.ws_manager.broadcast_agent_update.call_count == 1
+
+            # State changed outside the poll (e.g. parked from the dashboard)
+            agent.parked = True
+            await monitor._poll()
+            assert monitor.ws_manager.broadcast_agent_update.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_poll_detects_starting_agent_with_unchanged_output(self, monitor, agent):
+        """A STARTING agent is re-detected even when its capture has not changed."""
+        agent.status = AgentStatus.STARTING
+        agent.last_output = ""
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value=""),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            await monitor._poll()
+
+        assert agent.status == AgentStatus.IDLE
+
+    @pytest.mark.asyncio
+    async def test_poll_republishes_unchanged_agent_periodically(self, monitor, agent):
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value="claude >"),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            for _ in range(12):
+                await monitor._poll()
+
+        # first poll, then once after _MAX_SKIPPED_PUBLISHES (10) skips
+        assert monitor.ws_manager.broadcast_agent_update.call_count == 2
+
+    @pytest.fixture
+    def two_agents(self, monitor, agent):
+        other = Agent(
+            id="def456",
+            project_name="test-project",
+            session_name="forge__test-project__def456",
+            worktree_path="/tmp/worktree2",
+            branch_name="agent/def456/task",
+            status=AgentStatus.WORKING,
+        )
+        monitor.agent_manager.list_agents.return_value = [agent, other]
+        return agent, other
+
+    @pytest.mark.asyncio
+    async def test_poll_isolates_agent_failures(self, monitor, two_agents):
+        """An error polling one agent does not stop the others being polled."""
+        agent, other = two_agents
+
+        def capture(session_name, lines):
+            if session_name == agent.session_name:
+                raise RuntimeError("boom")
+            return "Proceed? Y/n"
+
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", side_effect=capture),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            await monitor._poll()
+
+        assert agent.status == AgentStatus.WORKING
+        assert other.status == AgentStatus.WAITING_INPUT
+
+    @pytest.mark.asyncio
+    async def test_poll_batches_captures(self, monitor, two_agents):
+        """Panes due for a capture are captured in a single tmux call."""
+        agent, other = two_agents
+        activity = {agent.session_name: 1, other.session_name: 1}
+        outputs = {agent.session_name: "Proceed? Y/n", other.session_name: "fatal: no"}
+        with (
+            patch("agent_forge.tmux_utils.list_pane_activity", return_value=activity),
+            patch("agent_forge.tmux_utils.capture_panes", return_value=outputs) as mock_batch,
+            patch("agent_forge.tmux_utils.capture_pane") as mock_capture,
+        ):
+            await monitor._poll()
+
+        mock_batch.assert_called_once_with([agent.session_name, other.session_name], lines=5000)
+        mock_capture.assert_not_called()
+        assert agent.status == AgentStatus.WAITING_INPUT
+        assert other.status == AgentStatus.ERROR
+
+    @pytest.mark.asyncio
+    async def test_poll_falls_back_when_batched_capture_fails(self, monitor, two_agents):
+        agent, other = two_agents
+        activity = {agent.session_name: 1, other.session_name: 1}
+        with (
+            patch("agent_forge.tmux_utils.list_pane_activity", return_value=activity),
+            patch("agent_forge.tmux_utils.capture_panes", return_value=None),
+            patch("agent_forge.tmux_utils.capture_pane", return_value="Proceed? Y/n") as mock_capture,
+        ):
+            await monitor._poll()
+
+        assert mock_capture.call_count == 2
+        assert agent.status == other.status == AgentStatus.WAITING_INPUT
+
     @pytest.mark.asyncio
     async def test_poll_logs_event_on_status_change(self, monitor, agent):
         """When db is set, status changes should be logged."""
@@ -171,7 +354,7 @@ class TestStatusMonitorPoll:
             patch("agent_forge.tmux_utils.capture_pane", return_value=new_output),
             patch("agent_forge.tmux_utils.session_exists", return_value=True),
             patch("agent_forge.status_monitor.log_event", new_callable=AsyncMock) as mock_log,
-            patch("agent_forge.status_monitor.save_snapshot", new_callable=AsyncMock),
+            patch("agent_forge.status_monitor.save_snapshots", new_callable=AsyncMock),
         ):
             await monitor._poll()
 
@@ -180,6 +363,23 @@ class TestStatusMonitorPoll:
             "status_change", {"status": AgentStatus.ERROR.value},
         )
 
+    @pytest.mark.asyncio
+    async def test_poll_saves_changed_agents_in_one_batch(self, monitor, two_agents):
+        agent, other = two_agents
+        monitor.db = MagicMock()
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value="claude >"),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+            patch("agent_forge.status_monitor.log_event", new_callable=AsyncMock),
+            patch("agent_forge.status_monitor.save_snapshots", new_callable=AsyncMock) as mock_save,
+        ):
+            await monitor._poll()
+            mock_save.assert_called_once_with(monitor.db, [agent, other])
+
+            # Nothing changed: nothing to save
+            await monitor._poll()
+            mock_save.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_poll_collects_metrics_on_interval(self, agent):
         """Verify metrics_collector.collect_all is called at configured interval."""
@@ -232,6 +432,16 @@ class TestStatusMonitorPoll:
 class TestExtractPromptText:
     """Test extract_prompt_text with various terminal outputs."""
 
+    def test_prompt_at_end_of_long_capture(self):
+        history = "\n".join(f"\x1b[2mline {i}\x1b[0m" for i in range(5000))
+        output = f"{history}\nDo you want to proceed?\n\x1b[0m\n\n"
+        result = StatusMonitor.extract_prompt_text(output)
+        assert result == "line 4997\nline 4998\nline 4999\nDo you want to proceed?"
+
+    def test_prompt_older_than_search_window_is_ignored(self):
+        output = "Allow this?\n" + "\n".join(f"line {i}" for i in range(40))
+        assert StatusMonitor.extract_prompt_text(output) == ""
+
     def test_yn_prompt(self):
         output = "Some build output\nMore output\nProceed? Y/n"
         result = StatusMonitor.extract_prompt_text(output)
@@ -312,6 +522,28 @@ class TestExtractActivitySummary:
         assert "Compiled 3 files" in result
         assert "⠂ Building" not in result
 
+    def test_long_capture_with_blank_rows(self):
+        history = "\n".join(f"line {i}" for i in range(5000))
+        output = history + "\n" * 100 + "all done\n" + "\n" * 200
+        result = StatusMonitor.extract_activity_summary(output).splitlines()
+        assert result == [f"line {i}" for i in range(4986, 5000)] + ["all done"]
+
+    def test_noise_prefilter_agrees_with_regex(self):
+        from agent_forge.status_monitor import _ACTIVITY_NOISE_RE, _is_activity_noise
+
+        lines = [
+            "Compiled 3 files in 2.1s", "  ❯ npm test", "──────────", "- - - - - -",
+            "ok", "  Thinking…", "ai(thinking)", "| Reading src/main.py", "✻ Pondering",
+            "\u00a0\u00a0⏺", "Tests: 12 passed (12)", "Ran the build…", "$", "· Scurrying…",
+        ]
+        for line in lines:
+            assert _is_activity_noise(line) == bool(_ACTIVITY_NOISE_RE.match(line)), line
+
+    def test_filters_channelling_status_lines(self):
+        output = "Real output\n  Channelling… (3s · esc to interrupt)\nChannellings stay"
+        result = StatusMonitor.extract_activity_summary(output)
+        assert result == "Real output\nChannellings stay"
+
     def test_filters_star_spinner_lines(self):
         output = "✢ processing\nReal output\n✳ building\n✶ done\n✽ cleaning"
         result = StatusMonitor.extract_activity_summary(output)
@@ -449,11 +681,59 @@ class TestWaitingInputNotification:
             patch("agent_forge.tmux_utils.session_exists", return_value=True),
         ):
             await monitor_with_connector._poll()
+            assert agent.status == AgentStatus.ERROR
+            cm = monitor_with_connector.connector_manager
+            # The plain notice waits for the status to hold for a second poll
+            cm.send_to_project_channels.assert_not_called()
+
+            await monitor_with_connector._poll()
 
-        assert agent.status == AgentStatus.ERROR
-        cm = monitor_with_connector.connector_manager
         cm.send_to_project_channels_rich.assert_not_called()
         cm.send_to_project_channels.assert_called_once()
+        assert "working -> error" in cm.send_to_project_channels.call_args[0][1]
+
+    @pytest.mark.asyncio
+    async def test_repeated_waiting_input_is_notified_each_time(
+        self, monitor_with_connector, agent
+    ):
+        """Returning to the same prompt after approval notifies again."""
+        outputs = ["Proceed? Y/n", "working...", "Proceed? Y/n"]
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", side_effect=outputs),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            for _ in outputs:
+                await monitor_with_connector._poll()
+
+        cm = monitor_with_connector.connector_manager
+        assert cm.send_to_project_channels_rich.call_count == 2
+        first, second = cm.send_to_project_channels_rich.call_args_list
+        assert first[0][1] == second[0][1]
+
+    @pytest.mark.asyncio
+    async def test_flapping_status_is_not_notified(self, monitor_with_connector, agent):
+        """A status that flips back on the next poll sends no plain notice."""
+        outputs = ["fatal: no", "user@host:~$ ", "fatal: no", "user@host:~$ "]
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", side_effect=outputs),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            for _ in outputs:
+                await monitor_with_connector._poll()
+
+        cm = monitor_with_connector.connector_manager
+        assert agent.status == AgentStatus.IDLE
+        cm.send_to_project_channels.assert_not_called()
+
+        # Once the status holds, the last transition is announced
+        with (
+            patch("agent_forge.tmux_utils.capture_pane", return_value="user@host:~$ "),
+            patch("agent_forge.tmux_utils.session_exists", return_value=True),
+        ):
+            await monitor_with_connector._poll()
+
+        cm.send_to_project_channels.assert_called_once()
+        assert "error -> idle" in cm.send_to_project_channels.call_args[0][1]
 
 
 class TestGetActivitySummary:
@@ -750,6 +1030,19 @@ class TestResponseRelay:
         assert "response" in text.lower()
         assert "I fixed the bug." in text
 
+    @pytest.mark.asyncio
+    async def test_relay_attaches_only_existing_files(self, relay_monitor, agent, tmp_path):
+        chart = tmp_path / "chart.png"
+        chart.write_bytes(b"png")
+        result = ExtractionResult(
+            text="Here is the chart.", file_paths=[str(chart), str(tmp_path / "gone.png")],
+        )
+        with patch("agent_forge.status_monitor.extract_response_regex", return_value=result):
+            await relay_monitor._relay_response(agent, "output")
+
+        call = relay_monitor.connector_manager.send_to_project_channels.call_args
+        assert call[1]["media_paths"] == [str(chart)]
+
     @pytest.mark.asyncio
     async def test_relay_skips_when_no_output(self, relay_monitor, agent):
         await relay_monitor._relay_response(agent, "")
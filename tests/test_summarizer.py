@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, patch
 import httpx
 import pytest
 
+from agent_forge import summarizer
 from agent_forge.summarizer import _preprocess_output, summarize_output
 
 
@@ -17,6 +18,10 @@ class TestPreprocessOutput:
         assert "\x1b" not in result
         assert "Hello" in result
 
+    def test_strips_dec_private_modes_and_osc(self):
+        raw = "\x1b]0;⠂ Building\x07\x1b[?2026hBuild succeeded\x1b[?2026l"
+        assert _preprocess_output(raw) == "Build succeeded"
+
     def test_filters_noise_lines(self):
         raw = "Real output\n> \n⠋ Loading...\n────────────\nDone."
         result = _preprocess_output(raw)
@@ -45,6 +50,12 @@ class TestPreprocessOutput:
 class TestSummarizeOutput:
     """Test summarize_output with mocked httpx."""
 
+    @pytest.fixture(autouse=True)
+    def _fresh_client(self, monkeypatch):
+        """Each test starts without a cached shared client or summaries."""
+        monkeypatch.setattr(summarizer, "_client", None)
+        monkeypatch.setattr(summarizer, "_summary_cache", summarizer.OrderedDict())
+
     @pytest.mark.asyncio
     async def test_successful_summary(self):
         mock_response = httpx.Response(
@@ -161,3 +172,67 @@ class TestSummarizeOutput:
         body = call_kwargs[1]["json"]
         assert body["model"] == "claude-sonnet-4-5-20250929"
         assert body["max_tokens"] == 100
+
+    @pytest.mark.asyncio
+    async def test_repeated_output_is_summarized_once(self):
+        mock_response = httpx.Response(
+            200,
+            json={"content": [{"type": "text", "text": "Summary"}]},
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        )
+        with patch("agent_forge.summarizer.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=False)
+            mock_client_cls.return_value = mock_client
+
+            first = await summarize_output("Some output", api_key="test-key")
+            # Only noise differs, so the API would see the same text
+            second = await summarize_output("Some output\n⠋ spin", api_key="test-key")
+            await summarize_output("Some output", api_key="test-key", max_tokens=100)
+
+        assert first == second == "Summary"
+        assert mock_client.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_summary_is_not_cached(self):
+        with patch("agent_forge.summarizer.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.post.side_effect = httpx.TimeoutException("timed out")
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=False)
+            mock_client_cls.return_value = mock_client
+
+            await summarize_output("Some output", api_key="test-key")
+            await summarize_output("Some output", api_key="test-key")
+
+        assert mock_client.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reuses_shared_client(self):
+        mock_response = httpx.Response(
+            200,
+            json={"content": [{"type": "text", "text": "Summary"}]},
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+        )
+        with patch("agent_forge.summarizer.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.is_closed = False
+            mock_client.post.return_value = mock_response
+            mock_client_cls.return_value = mock_client
+
+            await summarize_output("Some output", api_key="test-key", timeout=3.0)
+            await summarize_output("Other output", api_key="test-key", timeout=3.0)
+
+        assert mock_client_cls.call_count == 1
+        assert mock_client.post.call_count == 2
+        assert mock_client.post.call_args[1]["timeout"] == 3.0
+
+    @pytest.mark.asyncio
+    async def test_close_client(self):
+        mock_client = AsyncMock()
+        summarizer._client = mock_client
+        await summarizer.close_client()
+        mock_client.aclose.assert_awaited_once()
+        assert summarizer._client is None